@@ -26,6 +26,8 @@ from HSTB.shared.RegistryHelpers import *
 from HSTB.shared import Constants
 from HSTB.resources import PathToResource
 from HSTB.gui import About
+from HSTB.gui import ColorProgress
+from HSTB.gui import ProgressProcess
 
 _dHSTP = Constants.UseDebug()  # Control debug stuff (=0 to hide debug menu et al from users in the field)
 
@@ -182,6 +184,98 @@ class ZoomelatorSplitter(wx.SplitterWindow):
 # Pydro is using #2 but I think should switch to #4, 500 lines of code (15% of Pydro.py) are spent in the PROCESS function
 
 
+class StatusBarProgress(object):
+    '''Progress shown in place in a status bar field of an HSTP_AUI_Frame, see HSTP_AUI_Frame.StatusProgress.
+    One ColorProgress per bar, side by side in the field.  Update/Flush/Close work like ProgressProcess.MultiProgress
+    (same bar values and throttle) and are safe from worker threads, the bars are updated by a timer on the GUI thread.
+    A caption goes to the status text of field 0.
+    '''
+    cancelled = False  # there is no cancel button, kept for MultiProgress compatibility
+
+    def __init__(self, frame, bars=[[0, 100, '%.0f%%']], field=1, throttle=0.05):
+        self.frame = frame
+        self.field = field
+        self.bars = []
+        self.timer = None
+        self.closed = False
+        self.reader = ProgressProcess.QueueReader()
+        self.throttle = ProgressProcess.UpdateThrottle(self.reader.send, throttle)
+        if wx.IsMainThread():
+            self._Create(bars)
+        else:
+            wx.CallAfter(self._Create, bars)
+
+    def _Create(self, bars):
+        sbar = self.frame.sbar
+        if sbar.GetFieldsCount() <= self.field:
+            sbar.SetFieldsCount(self.field + 1)
+        for vmin, vmax, txt in bars:
+            prog = ColorProgress.ColorProgress(sbar, -1, style=0)
+            prog.min, prog.max = vmin, vmax
+            prog.position = vmin
+            prog.SetText(txt)
+            prog.ShowPercent()
+            self.bars.append(prog)
+        self.frame.status_progress.append(self)
+        self.Layout()
+        self.timer = wx.Timer()
+        self.timer.Bind(wx.EVT_TIMER, self.OnTimer)
+        self.timer.Start(50)
+
+    def Layout(self):
+        if self.bars:
+            rect = self.frame.sbar.GetFieldRect(self.field)
+            w = rect.width // len(self.bars)
+            for n, prog in enumerate(self.bars):
+                prog.SetSize(rect.x + n * w, rect.y, w, rect.height)
+
+    def OnTimer(self, event):
+        try:
+            data = self.reader.read()
+        except EOFError:
+            self._Destroy()
+            return
+        for prog, v in zip(self.bars, data or []):
+            if v:
+                if len(v) > 4 and v[4] is not None:
+                    prog.min = v[4]
+                if len(v) > 3 and v[3] is not None:
+                    prog.max = v[3]
+                prog.position = v[0]
+                if len(v) > 1 and v[1] and self.field != 0:
+                    self.frame.sbar.SetStatusText(v[1], 0)
+                if len(v) > 2 and v[2]:
+                    prog.SetText(v[2])
+
+    def _Destroy(self):
+        self.timer.Stop()
+        for prog in self.bars:
+            prog.Destroy()
+        self.bars = []
+        if self in self.frame.status_progress:
+            self.frame.status_progress.remove(self)
+
+    def Update(self, barValues):
+        '''See ProgressProcess.MultiProgress.Update.'''
+        self.throttle.Update(barValues)
+
+    def Flush(self):
+        self.throttle.Flush()
+
+    def Close(self):
+        '''The bars are removed once the last update has been shown.'''
+        if not self.closed:
+            self.closed = True
+            self.throttle.Close()
+            self.reader.close()  # OnTimer gets EOFError after the remaining updates and destroys the bars
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.Close()
+
+
 class HSTPMenuGroup(list):
 
     def __init__(self, menutxt, submenu=[], id=-1):
@@ -783,13 +877,30 @@ class HSTP_AUI_Frame(wx.Frame):
         self.sbar = self.CreateStatusBar(1, STB_SIZEGRIP)  # Create a status bar--start with 1 field, then specify actual #...
         nfields = 2
         self.sbar.SetFieldsCount(nfields)   # start with 2 w/default widths [-1,-1]; apps add more
+        self.status_progress = []
+        self.sbar.Bind(wx.EVT_SIZE, self.OnStatusBarSize)  # field rects are only current once the status bar itself resized
+
+    def StatusProgress(self, bars=[[0, 100, '%.0f%%']], field=1, throttle=0.05):
+        '''Report progress in place in status bar field (1 is reserved for progress by SetStatusbarWidths) instead of
+        a separate progress process, returns a StatusBarProgress which can be fed from worker threads:
+            with frame.StatusProgress([[0, n, 'Loading %.0f%%']]) as prog:
+                for i in range(n):
+                    prog.Update([[i + 1]])
+        '''
+        return StatusBarProgress(self, bars, field, throttle)
 
     def OnSize(self, event):
         self.ResizeStatusBar()
         event.Skip()
 
+    def OnStatusBarSize(self, event):
+        self.ResizeStatusBar()
+        event.Skip()
+
     def ResizeStatusBar(self):
-        pass  # used to position progress bars
+        '''Positions the progress bars of StatusProgress in their status bar fields.'''
+        for prog in getattr(self, 'status_progress', []):
+            prog.Layout()
 
     def OnIdle(self, event):
         pass
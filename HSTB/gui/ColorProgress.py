@@ -1,34 +1,174 @@
 # This module was generated by the wx.activex.GernerateAXModule class
 # (See also the genaxmodule script.)
 
+from collections import OrderedDict
+
 import wx
 
 
+class PaintScheduler(object):
+    '''Coalesces repaint requests from any number of controls into one refresh pass at most every interval ms.
+    Unlike dropping paints, the latest state is always painted.
+    '''
+
+    def __init__(self, interval=50):
+        self.interval = interval
+        self.pending = {}  # id(window) -> (window, dirty wx.Rect or None for all of it)
+        self.timer = None
+
+    def Invalidate(self, win, rect=None):
+        key = id(win)
+        if key in self.pending:
+            prev = self.pending[key][1]
+            if prev is not None:
+                rect = None if rect is None else wx.Rect(prev).Union(rect)
+            else:
+                rect = None
+        self.pending[key] = (win, rect)
+        if self.timer is None:
+            self.timer = wx.CallLater(self.interval, self.Flush)
+
+    def Flush(self):
+        self.timer = None
+        pending, self.pending = self.pending, {}
+        for win, rect in pending.values():
+            if not win:
+                continue  # destroyed meanwhile
+            if rect is None:
+                win.Refresh(False)
+            else:
+                win.RefreshRect(rect, False)
+
+
+_scheduler = None
+
+
+def GetPaintScheduler():
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = PaintScheduler()
+    return _scheduler
+
+
+class GradientCache(object):
+    '''Gradient and background bitmaps shared by every ColorProgress, least recently used first out.
+    Each entry is (background bitmap, gradient bitmap, memory DC holding the gradient) keyed by
+    (width, height, left colour, right colour), so bars of one dialog share one set and resizing reuses sizes seen before.
+    '''
+
+    def __init__(self, size=16):
+        self.size = size
+        self.items = OrderedDict()
+
+    def Get(self, cx, cy, col1, col2):
+        cx, cy = max(cx, 1), max(cy, 1)
+        key = (cx, cy, col1, col2)
+        item = self.items.pop(key, None)
+        if item is None:
+            item = self._Create(cx, cy, col1, col2)
+            while len(self.items) >= self.size:
+                # don't deselect the bitmap, bars that fetched the entry may still blit from its DC;
+                # it is released with the last reference
+                self.items.popitem(last=False)
+        self.items[key] = item
+        return item
+
+    @staticmethod
+    def _Create(cx, cy, col1, col2):
+        back_bmp = wx.Image(cx, cy).ConvertToBitmap()
+        bmp = wx.Image(cx, cy).ConvertToBitmap()
+        dc = wx.MemoryDC()
+        dc.SelectObject(bmp)
+        dc.GradientFillLinear(wx.Rect(0, 0, cx + 1, cy + 1), ColorProgress.IntToColor(col1), ColorProgress.IntToColor(col2))
+        return back_bmp, bmp, dc
+
+
+gradients = GradientCache()
+_label_font = None
+_text_extents = {}
+
+
+def GetLabelFont():
+    global _label_font
+    if _label_font is None:
+        _label_font = wx.SystemSettings.GetFont(wx.SYS_DEFAULT_GUI_FONT)
+        _label_font.SetWeight(wx.FONTWEIGHT_BOLD)
+    return _label_font
+
+
+def GetLabelExtent(dc, label):
+    '''Text extent of label in the current font of dc, cached across paints and bars.
+    Keyed by font and PPI too, so a font change or a monitor with another DPI doesn't get stale sizes.
+    '''
+    font = dc.GetFont()
+    key = (font.GetNativeFontInfoDesc() if font.IsOk() else '', tuple(dc.GetPPI()), label)
+    try:
+        return _text_extents[key]
+    except KeyError:
+        if len(_text_extents) > 512:
+            _text_extents.clear()
+        extent = _text_extents[key] = dc.GetTextExtent(label)
+        return extent
+
+
 class ColorProgress(wx.Panel):
     def __init__(self, parent, id=wx.ID_ANY, pos=wx.DefaultPosition, size=(-1, 30), style=0, name='ColorProgress'):
         self.bShowPercent = False
-        self.bmp = wx.Bitmap(1, 1)
-        self.back_bmp = wx.Bitmap(1, 1)
-        wx.Panel.__init__(self, parent, id, pos, size, style=wx.SUNKEN_BORDER)
-        # wx.lib.agw.pyprogress.ProgressGauge.__init__(self, parent, id=id, pos=pos, size=size)
         self._lc = 0xff0000
         self._rc = 0x0000ff
+        self.back_bmp, self.bmp, self._gradient_dc = gradients.Get(1, 1, self._lc, self._rc)  # replaced at the first size/paint
+        wx.Panel.__init__(self, parent, id, pos, size, style=wx.SUNKEN_BORDER)
+        # wx.lib.agw.pyprogress.ProgressGauge.__init__(self, parent, id=id, pos=pos, size=size)
         self._minv = 0
         self._maxv = 100
+        self._shown = None  # (filled pixels, label) last asked to be painted
+        self.msg_txt = ''
         self.position = 50
-        self.bOkToDraw = True
         self.Bind(wx.EVT_PAINT, self.OnPaint)
         self.Bind(wx.EVT_ERASE_BACKGROUND, self.OnEraseBackground)
+        self.Bind(wx.EVT_SIZE, self.OnSize)
         self.Bind(wx.EVT_LEFT_DOWN, self.OnMouseDown)
-
-        ID_Timer = wx.NewId()
-        self.AutoTimer = wx.Timer(self, ID_Timer)
-        self.Bind(wx.EVT_TIMER, self.OnTimer, id=ID_Timer)
-        self.AutoTimer.Start(300)
         #self.Bind(wx.EVT_LEFT_UP, self.OnMouseUp)
 
-    def OnTimer(self, event=None):
-        self.bOkToDraw = True
+    def Fraction(self):
+        divisor = float(self.max - self.min)
+        if divisor == 0:
+            divisor = 100
+        return float(self.position - self.min) / divisor
+
+    def ProgressLabel(self, perc=None):
+        if not self.bShowPercent:
+            return None
+        if perc is None:
+            perc = self.Fraction()
+        try:
+            return self.msg_txt % (perc * 100.0)
+        except TypeError:
+            return self.msg_txt
+
+    def _state(self):
+        cx = self.GetClientSize()[0]
+        perc = self.Fraction()
+        return int(min(max(perc * cx, 0), cx)), self.ProgressLabel(perc)
+
+    def Invalidate(self):
+        '''Schedule a repaint if the filled width or the label changed, only the filled part (old or new, whichever
+        is wider) when the label is the same -- the gradient is stretched over the filled width so all of it changes.
+        '''
+        state = self._state()
+        old = self._shown
+        if state == old:
+            return
+        self._shown = state
+        if old is not None and old[1] == state[1]:
+            GetPaintScheduler().Invalidate(self, wx.Rect(0, 0, max(old[0], state[0]) + 1, self.GetClientSize()[1]))
+        else:
+            GetPaintScheduler().Invalidate(self)
+
+    def OnSize(self, event):
+        self._shown = None
+        self.Invalidate()
+        event.Skip()
 
     def __getleftcolor(self):
         return self._lc
@@ -59,7 +199,7 @@ class ColorProgress(wx.Panel):
 
     def __setpos(self, value):
         self._v = value
-        self.Refresh()
+        self.Invalidate()
 
     def __delpos(self):
         del self._v
@@ -70,7 +210,8 @@ class ColorProgress(wx.Panel):
 
     def __setmin(self, value):
         self._minv = value
-        self.Refresh()
+        if hasattr(self, '_v'):
+            self.Invalidate()
 
     def __delmin(self):
         del self._minv
@@ -81,7 +222,8 @@ class ColorProgress(wx.Panel):
 
     def __setmax(self, value):
         self._maxv = value
-        self.Refresh()
+        if hasattr(self, '_v'):
+            self.Invalidate()
 
     def __delmax(self):
         del self._maxv
@@ -133,9 +275,11 @@ class ColorProgress(wx.Panel):
 
     def ShowPercent(self):
         self.bShowPercent = True
+        self.Invalidate()
 
     def SetText(self, txt):
         self.msg_txt = txt
+        self.Invalidate()
 
     def ShowDosPrint(self):
         self.bDosPrint = True
@@ -153,67 +297,41 @@ class ColorProgress(wx.Panel):
 
     def CreateCachedGradient(self):
         cx, cy = self.GetClientSize()
-        col1 = self.GetFirstGradientColour()
-        col2 = self.GetSecondGradientColour()
-
-        # r1, g1, b1 = int(col1.Red()), int(col1.Green()), int(col1.Blue())
-        # r2, g2, b2 = int(col2.Red()), int(col2.Green()), int(col2.Blue())
-
-        imagetif = wx.Image(cx, cy)
-        self.bmp = imagetif.ConvertToBitmap()
-
-        dc = wx.MemoryDC()
-        dc.SelectObject(self.bmp)
-        dc.GradientFillLinear(wx.Rect(0, 0, cx + 1, cy + 1), col1, col2)
-        # for n in range(cx):
-        # dc.SetPen(wx.Pen(wx.Colour(r1+float(r2-r1)*n/float(cx),g1+float(g2-g1)*n/float(cx),b1+float(b2-b1)*n/float(cx)), 1, wx.SOLID))
-        # dc.DrawLine(n,0,n, cy-1)
-
-        imagetif = wx.Image(cx, cy)
-        self.back_bmp = imagetif.ConvertToBitmap()
-        dc.SelectObject(self.back_bmp)
+        self.back_bmp, self.bmp, self._gradient_dc = gradients.Get(cx, cy, self._lc, self._rc)
         self.Refresh(eraseBackground=False)
 
-        dc.SelectObject(wx.NullBitmap)
-
     def OnPaint(self, event):
         dc = wx.PaintDC(self)
         self.DrawProgress(dc)
 
-    def DrawGradient(self, gc, cx, cy, perc):
-        if cx != self.bmp.Width or cy != self.bmp.Height:
-            self.CreateCachedGradient()
+    def DrawGradient(self, dc, cx, cy, perc):
+        if (max(cx, 1), max(cy, 1)) != (self.bmp.Width, self.bmp.Height):
+            # already painting, so no Refresh as CreateCachedGradient does
+            self.back_bmp, self.bmp, self._gradient_dc = gradients.Get(cx, cy, self._lc, self._rc)
         end = perc * cx
         if end > cx:
             end = cx
         if end < 0:
             end = 0
-        gc.DrawBitmap(self.back_bmp, 0, 0, cx, cy)
-        gc.DrawBitmap(self.bmp, 0, 0, end, cy)
+        dc.DrawBitmap(self.back_bmp, 0, 0)
+        if int(end) > 0:
+            # squeeze the whole gradient into the filled part, as the bar always spans both colours
+            dc.StretchBlit(0, 0, int(end), cy, self._gradient_dc, 0, 0, self.bmp.Width, self.bmp.Height)
 
     def DrawProgress(self, dc):
-        if self.bOkToDraw:
-            #// Draw the gradient
-            xsize, ysize = self.GetClientSize()
-            gc = wx.GraphicsContext.Create(dc)
-            divisor = float(self.max - self.min)
-            if divisor == 0:
-                divisor = 100
-            perc = float(self.position - self.min) / divisor
-            self.DrawGradient(gc, xsize, ysize, perc)
-
-    #        // Show percent indicator if needed
-            if self.bShowPercent:
-                font = wx.SystemSettings.GetFont(wx.SYS_DEFAULT_GUI_FONT)
-                font.SetWeight(wx.BOLD)
-                gc.SetFont(font, wx.WHITE)
-                try:
-                    label = self.msg_txt % (perc * 100.0)
-                except TypeError:
-                    label = self.msg_txt
-                w, h = gc.GetTextExtent(label)
-                gc.DrawText(label, xsize / 2 - w / 2, ysize / 2 - h / 2)
-            self.bOkToDraw = False
+        #// Draw the gradient
+        xsize, ysize = self.GetClientSize()
+        perc = self.Fraction()
+        self.DrawGradient(dc, xsize, ysize, perc)
+
+#        // Show percent indicator if needed
+        if self.bShowPercent:
+            dc.SetFont(GetLabelFont())
+            dc.SetTextForeground(wx.WHITE)
+            dc.SetBackgroundMode(wx.TRANSPARENT)
+            label = self.ProgressLabel(perc)
+            w, h = GetLabelExtent(dc, label)
+            dc.DrawText(label, int(xsize / 2 - w / 2), int(ysize / 2 - h / 2))
 
 
 if __name__ == "__main__":
@@ -34,6 +34,7 @@ g.windows['text_control'] or g.windows.text_control
 
 import traceback
 import re
+import datetime
 from collections.abc import MutableMapping
 
 import wx
@@ -47,63 +48,140 @@ except:
     bWin32 = False
 
 from HSTB.shared import RegistryHelpers
+from HSTB.gui.ValueAdapters import ValueAdapters
+from HSTB.gui import Settings
 
 
-def getAllChildren(w, recurse):
-    '''For recurse returns the window being called, children, grandchildren etc.
-    For recurse=False returns window.GetChildren() which won't include the window itself
+def iterAllChildren(w, recurse):
+    '''Generator version of getAllChildren, same order (depth first, parents before children).
+    Uses an explicit stack so deep trees can't hit the recursion limit and a search can stop at the first match.
     '''
-    if recurse:
-        L = [w]
+    if not recurse:
+        for c in w.GetChildren():
+            yield c
+        return
+    stack = [w]
+    while stack:
+        w = stack.pop()
+        yield w
         try:
-            if len(w.GetChildren()) > 0:
-                for c in w.GetChildren():
-                    L += getAllChildren(c, recurse)
+            children = w.GetChildren()
         except AttributeError as e:
             # There is some bug/oddity in wxPython 3.0.2 where a ComboCtrl (and GenericDatePicker which uses it) doesn't return Children as wx objects but as SWIG Pointer and this makes the function fail.
             if "wxComboCtrl" in str(w):  # combo ctrls have transient children that popup but don't hold a value as such.  They should be ignored in (almost) all cases.
-                pass
-            else:
-                raise e
-    else:
-        L = list(w.GetChildren())  # converts from wxWindowList to standard python list -- FWIW
-    return L
+                continue
+            raise e
+        if len(children) > 0:
+            stack.extend(reversed(list(children)))
+
+
+def getAllChildren(w, recurse):
+    '''For recurse returns the window being called, children, grandchildren etc.
+    For recurse=False returns window.GetChildren() which won't include the window itself
+    '''
+    return list(iterAllChildren(w, recurse))  # converts from wxWindowList to standard python list -- FWIW
 
 
 class win_iter:
     def __init__(self, parent, recurse=True):
-        self.children = getAllChildren(parent, recurse)
-        self.i = 0
+        self.children = iterAllChildren(parent, recurse)
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        self.i += 1
-        try:
-            return self.children[self.i - 1]
-        except IndexError:
-            raise StopIteration
+        return next(self.children)
 
 
 class win_dict(MutableMapping):
     '''When retrieving window instances can either call as dictionary or attribute:
     self.windows['plotScaleW']
     self.windows.plotScaleW
+
+    Lookups use a name->window index built on first use and dropped whenever a window is created or destroyed
+    under parent (EVT_WINDOW_CREATE/EVT_WINDOW_DESTROY).  Those events can arrive late (wxGTK sends the create at
+    realize time), so a name that isn't in the index rebuilds it once per index generation, or again if the number
+    of parent's children changed, before raising KeyError.  Other misses don't walk the tree again, so call Reindex()
+    after giving an existing window a new name with SetName.
     '''
 
     def __init__(self, parent, recurse=True):
         self.parent = parent
         self.recurse = recurse
+        self._windows = None
+        self._index = None
+        self._nchildren = None  # len(parent.GetChildren()) when the index was built
+        self._miss_rebuilt = False  # a miss already rebuilt the index since the last create/destroy/Reindex
+        try:
+            parent.Bind(wx.EVT_WINDOW_CREATE, self.OnWindowsChanged)
+            parent.Bind(wx.EVT_WINDOW_DESTROY, self.OnWindowsChanged)
+        except AttributeError:
+            pass  # not a wx window
+
+    def OnWindowsChanged(self, event):
+        self.Reindex()
+        event.Skip()
+
+    def Reindex(self):
+        self._windows = None
+        self._index = None
+        self._miss_rebuilt = False
+
+    def _ChildCount(self):
+        try:
+            return len(self.parent.GetChildren())
+        except (AttributeError, RuntimeError):
+            return None
+
+    def WindowList(self):
+        '''The windows in traversal order, cached until the next create/destroy.'''
+        if self._windows is None:
+            self._windows = list(win_iter(self.parent, self.recurse))
+        return self._windows
+
+    def _Index(self):
+        if self._index is None:
+            index = {}
+            for w in self.WindowList():
+                try:
+                    index.setdefault(w.GetName(), w)  # first one wins, like the old linear search
+                except AttributeError:
+                    pass
+            self._index = index
+            self._nchildren = self._ChildCount()
+        return self._index
 
     def __iter__(self):
-        return win_iter(self.parent, self.recurse)
+        return iter(self.WindowList())
 
     def __getitem__(self, name):
-        for w in self.__iter__():
+        w = self._Index().get(name)
+        if w is None:
+            if self._miss_rebuilt and self._ChildCount() == self._nchildren:
+                raise KeyError("Object has no key '%s'" % str(name))
+            self.Reindex()  # may have been created since the index was built, its create event not seen yet
+            self._miss_rebuilt = True
+            w = self._Index().get(name)
+            if w is None:
+                raise KeyError("Object has no key '%s'" % str(name))
+            return w
+        try:
             if w.GetName() == name:
                 return w
-        raise KeyError("Object has no key '%s'" % str(name))
+        except RuntimeError:
+            pass  # destroyed without us hearing about it
+        self.Reindex()  # the indexed window was renamed or destroyed since the index was built
+        w = self._Index().get(name)
+        if w is None:
+            raise KeyError("Object has no key '%s'" % str(name))
+        return w
+
+    def __contains__(self, name):
+        try:
+            self.__getitem__(name)
+        except KeyError:
+            return False
+        return True
 
     def keys(self):
         for w in self.__iter__():
@@ -132,17 +210,180 @@ class win_dict(MutableMapping):
         raise Exception("unimplemented __setitem__ in win_dict")
 
 
+def _GetComboBox(w):
+    return w.GetValue()
+
+
+def _SetComboBox(w, value):
+    if value is None:
+        value = ""
+    w.SetValue(value)
+
+
+def _GetCheckListBox(w):
+    return w.GetCheckedStrings()
+
+
+def _SetCheckListBox(w, value):
+    if value is None:
+        value = ""
+    w.SetCheckedStrings(value)
+
+
+def _GetSelection(w):
+    return w.GetStringSelection()
+
+
+def _SetSelection(w, value):
+    if value is None:
+        try:
+            w.SetStringSelection("")
+        except:
+            pass
+    if value is not None:
+        w.SetStringSelection(value)
+
+
+def _GetStaticText(w):
+    return w.GetLabel()
+
+
+def _SetStaticText(w, value):
+    try:
+        if value is None:
+            value = ""
+        w.SetLabel(value)
+    except:
+        w.SetLabel(str(value))
+
+
+def _GetCheckBox(w):
+    if w.Is3State():  # note: tri-mode checkboxes eval to True if wx.CHK_CHECKED or wx.CHK_UNDETERMINED
+        return w.Get3StateValue()  # wx.CHK_CHECKED,wx.CHK_UNCHECKED,wx.CHK_UNDETERMINED
+    else:
+        return w.GetValue()
+
+
+def _SetCheckBox(w, value):
+    if w.Is3State():  # note: for tri-mode checkboxes, Set3StateValue(False)==Set3StateValue(wx.CHK_UNCHECKED)
+        if value is None:
+            value = wx.CHK_UNCHECKED
+        w.Set3StateValue(value)  # wx.CHK_CHECKED,wx.CHK_UNCHECKED,wx.CHK_UNDETERMINED
+    else:
+        if value is None:
+            value = False
+        w.SetValue(value)
+
+
+def _GetDatePicker(w):
+    dte = w.GetValue()
+    if dte.IsValid():
+        return dte.FormatISODate()
+    else:
+        return None
+
+
+def _GetCalendar(w):
+    return w.GetDate().FormatISODate()
+
+
+# code from s100py.s1xx for decent iso parsing, better than python 3.7 builtin  function too.
+re_date = r"(?P<year>\d{4})[-]?(?P<month>\d{2})[-]?(?P<day>\d{2})"
+re_time = r"(?P<hour>\d{2})[: -]?(?P<minute>\d{2})[:-]?(?P<second>\d{2})(?P<decimal_sec>\.\d+)?"
+re_timezone = r"(?P<tz>(Z|(?P<tz_hr>[+-]\d{2})[:]?(?P<tz_min>\d{2})?))?"
+re_time_with_zone = re_time + re_timezone
+re_date_optional_time = re_date + "T?(" + re_time_with_zone + ")?"
+date_optional_time_pattern = re.compile(re_date_optional_time)
+
+
+def _ToDMY(value):
+    '''(day, zero based month, year) from a date/datetime or an ISO string'''
+    if isinstance(value, datetime.date):  # includes datetime.datetime, no need to format and reparse
+        return value.day, value.month - 1, value.year
+    if not isinstance(value, (str)):  # other datetime-like object?
+        value = value.isoformat()
+    match = date_optional_time_pattern.match(value).groupdict()
+    return int(match['day']), int(match['month']) - 1, int(match['year'])
+
+
+def _SetCalendarDate(w, day, month, year):
+    old = w.GetDate()
+    w.SetDate(wx.DateTime.FromDMY(day, month, year))
+    if old.IsValid() and old.GetMonth() == month and old.GetYear() != year:
+        # bug in Calendar control is not refreshing the month dropdown box (when year is different but month was same)
+        # only that case needs the month jittered to make the display refresh, frozen so it repaints once
+        w.Freeze()
+        try:
+            w.SetDate(wx.DateTime.FromDMY(1, (month + 1) % 12, year))
+            w.SetDate(wx.DateTime.FromDMY(day, month, year))
+        finally:
+            w.Thaw()
+
+
+def _SetDate(w, value):
+    if value is not None:
+        day, month, year = _ToDMY(value)
+        if isinstance(w, CalendarCtrl):
+            _SetCalendarDate(w, day, month, year)
+        else:
+            w.SetValue(wx.DateTime.FromDMY(day, month, year))
+    else:  # Trying to re-initialize the control
+        if isinstance(w, GenericDatePickerCtrl):
+            w.SetValue(wx.DateTime())  # send an invalid time object which clears the control
+        else:
+            w.SetDate()  # @todo this will probably raise an exception -- need to fix
+
+
+def _GetValue(w):
+    # we don't want w (ctrl) in general!; quasi-persistent GuiConfig ctrls are the exception rather than the rule (wx.Panel "hack" above); i.e., they become PyDeadObject
+    return w.GetValue()
+
+
+def _SetValue(w, value):
+    try:
+        try:
+            w.SetValue(value)
+        except (TypeError, ValueError):  # IntCtrl raises a ValueError if a long is passed in (like 1L )
+            try:
+                uv = "" if value is None else str(value)
+                w.SetValue(uv)  # most controls like strings, in case user sent an integer etc.
+            except (TypeError, ValueError):
+                # traceback.print_exc()
+                uv = 0 if value is None else int(value)
+                w.SetValue(int(value))  # spin controls want integers, perhaps we have a string here
+    except:  # catch all; including PyDeadObject bugfix
+        # traceback.print_exc()
+        print("Error while trying to setitem in GuiConfig:")
+        print(w.GetName(), value)  # this shouldn't be too silent -- it's really a bug that needs to be found if it gets here.
+
+
+# getter/setter per control class, extend with value_adapters.register(cls, getter, setter) for custom controls
+value_adapters = ValueAdapters(_GetValue, _SetValue)
+value_adapters.register(wx.ComboBox, _GetComboBox, _SetComboBox)  # a subclass of wx.Choice on some platforms -- the MRO picks ComboBox first
+value_adapters.register(wx.CheckListBox, _GetCheckListBox, _SetCheckListBox)
+value_adapters.register((wx.RadioBox, wx.Choice), _GetSelection, _SetSelection)
+value_adapters.register(wx.StaticText, _GetStaticText, _SetStaticText)
+value_adapters.register(wx.CheckBox, _GetCheckBox, _SetCheckBox)
+value_adapters.register(GenericDatePickerCtrl, _GetDatePicker, _SetDate)
+value_adapters.register(CalendarCtrl, _GetCalendar, _SetDate)
+
+
 class GuiConfig:
     ''' If using the registry to save/load, it will autoload if the use_registry is supplied on __init__.
-    Otherwise call UseRegistry and LoadFromRegistry.
+    Otherwise call UseRegistry and LoadFromRegistry.  registry_root is passed on to UseRegistry.
     It will auto store if derived from a wx.frame but not wx.Dialog as the EVT_CLOSE doesn't seem to catch for dialogs.
     For a Dialog, call manually after an ShowModal() == ID_OK so that only saved when user is happy with the choices,
     discard when dialog is cancelled.
 
     Recurse defines if only children are searched or if all descendant windows (grandchildren etc) are considered.
     '''
+    # internal state is underscored so it can't hide a control of the same name from __getattr__
+    _value_adapters = value_adapters  # shared by all GuiConfigs, register custom control classes with the module's value_adapters
+    _settings = None  # backend for Load/SaveToRegistry, see UseSettings
+    _registry_root = None  # registry root passed to Settings.GetSettings, None uses Settings.REGISTRY_ROOT
+    _persisted = None  # {name: value} as last loaded from/saved to the settings, SaveToRegistry only writes changes
 
-    def __init__(self, root, items=None, use_registry='', recurse=True):
+    def __init__(self, root, items=None, use_registry='', recurse=True, registry_root=None):
         self.root = root  # @todo there is a recursion problem occuring if root==self on the destruction of the root/self.
         if root is self:
             self.root = None
@@ -150,7 +391,7 @@ class GuiConfig:
         self.windows = win_dict(self.GetRoot(), recurse)  # self.__dict__['root'])
         if items:
             self.SetGUI(items)
-        self.UseRegistry(use_registry)
+        self.UseRegistry(use_registry, registry_root)
         self.LoadFromRegistry()
         self.RestorePosition()
         self.GetRoot().Bind(wx.EVT_CLOSE, self.OnCloseWin)
@@ -195,17 +436,33 @@ class GuiConfig:
                     print(traceback.print_exc())
                     raise KeyError
 
-    def UseRegistry(self, key=''):
+    def UseRegistry(self, key='', root=None):
+        '''root is the registry path the keys live under (see Settings.REGISTRY_ROOT), it lets the registry be
+        read and written a key at a time instead of a value at a time.
+        '''
         self.reg_key = key
+        if root:
+            self.__dict__['_registry_root'] = root
+        self.__dict__['_persisted'] = None  # a different key, nothing known about what it holds
+
+    def UseSettings(self, backend):
+        '''Persist the control values with a Settings backend (e.g. Settings.JSONSettings()) instead of the registry.'''
+        self.__dict__['_settings'] = backend
+        self.__dict__['_persisted'] = None
+
+    def GetSettings(self):
+        if self._settings is None:
+            self.__dict__['_settings'] = Settings.GetSettings(self._registry_root)  # the registry on Windows, like before
+        return self._settings
 
     def LoadFromRegistry(self):
         if self.reg_key:
-            for name in self.keys():
-                val = RegistryHelpers.GetDWORDFromRegistry(self.reg_key, name, None, bSilent=True)
-                if val is None:
-                    val = RegistryHelpers.GetPathFromRegistry(self.reg_key + '\\' + name, None, '')
-                if val is not None:
-                    self.__setitem__(name, val)
+            names = list(self.keys())
+            values = self.GetSettings().load_all(self.reg_key, names)  # one read of the whole key
+            for name in names:
+                if name in values:
+                    self.__setitem__(name, values[name])
+            self.__dict__['_persisted'] = values
 
     def __setstate__(self, o):
         self.SetGUI(o)
@@ -219,23 +476,26 @@ class GuiConfig:
     def SaveToRegistry(self):
         '''
         Doesn't save things with default names as these could accidentally overwrite static items that are set by the constructor.
+        Only values that differ from what was last loaded or saved (self._persisted) are written.
         '''
         if self.reg_key:
                 # store everything that has a (potentially) unique name; avoid things with default name like wxSpinCtrl or staticText.
+            values = {}
             for name, w in self.named_windows():
                 try:
                     val = self.GetWindowValue(w)  # self.__getitem__(name) #using getitem is causing an n^2 problem as we are essentially calling iterwindows again for each window found.
-                    if isinstance(val, int):
-                        RegistryHelpers.SaveDWORDToRegistry(self.reg_key, name, val)
-                    elif isinstance(val, (str)):
-                        try:
-                            RegistryHelpers.SavePathToRegistry(self.reg_key + '\\' + name, str(val), '')
-                        except UnicodeEncodeError:
-                            pass  # could be a label with a non-ascii character (like a degrees symbol)
+                    if isinstance(val, (int, str)):
+                        values[name] = val
                     else:
                         print('unknown window value type:', name, val, type(val))
                 except AttributeError:
                     print('Attribute Error', name)
+            persisted = self._persisted if self._persisted is not None else {}
+            changed = dict((k, v) for k, v in values.items() if k not in persisted or persisted[k] != v)
+            if changed:
+                self.GetSettings().save_all(self.reg_key, changed)  # one write of the modified values
+            persisted.update(changed)
+            self.__dict__['_persisted'] = persisted
             self.SavePosition()
 
     def SavePosition(self):
@@ -296,7 +556,7 @@ class GuiConfig:
                 self.Maximize(True)  # calling self.Maximize(max) causes weird screen flicker if max=false
 
     def iterwindows(self, w=None):
-        return win_iter(self.GetRoot(), self.recurse)
+        return iter(self.windows.WindowList())
 
     def keys(self):
         for w in self.iterwindows():
@@ -335,6 +595,7 @@ class GuiConfig:
 
     def named_windows(self):
         '''returns a list of named windows that are not the standard names'''
+        self.windows.Reindex()  # saving must see windows added or renamed without a create/destroy event reaching us
         n = []
         for w in self.windows:  # store everything that has a (potentially) unique name; avoid things with default name like wxSpinCtrl or staticText.
             name = str(w.GetName())
@@ -346,13 +607,13 @@ class GuiConfig:
         return n
 
     def __len__(self):
-        return len(list(self.keys()))
+        return len(self.windows.WindowList())
 
     def __contains__(self, item):
-        return item in list(self.keys())
+        return item in self.windows
 
     def has_key(self, key):
-        return key in list(self.keys())
+        return key in self.windows
 
     def __getitem__(self, key):
         '''Returns a value from the control that would be 'natural' like a boolean for a checkbox or a string for a text control.
@@ -367,37 +628,7 @@ class GuiConfig:
         return self.GetWindowValue(w)
 
     def GetWindowValue(self, w):
-        if isinstance(w, wx.ComboBox):  # This is a subclass of wx.Choice -- so check ComboBox and use GetValue first
-            return w.GetValue()
-        elif isinstance(w, wx.CheckListBox):
-            return w.GetCheckedStrings()
-        elif isinstance(w, (wx.RadioBox, wx.Choice)):
-            return w.GetStringSelection()
-        elif isinstance(w, wx.StaticText):
-            return w.GetLabel()
-        elif isinstance(w, wx.CheckBox):
-            if w.Is3State():  # note: tri-mode checkboxes eval to True if wx.CHK_CHECKED or wx.CHK_UNDETERMINED
-                return w.Get3StateValue()  # wx.CHK_CHECKED,wx.CHK_UNCHECKED,wx.CHK_UNDETERMINED
-            else:
-                return w.GetValue()
-        elif isinstance(w, GenericDatePickerCtrl):
-            dte = w.GetValue()
-            if dte.IsValid():
-                return dte.FormatISODate()
-            else:
-                return None
-        elif isinstance(w, CalendarCtrl):
-            return w.GetDate().FormatISODate()
-        # we don't want w (ctrl) in general!; quasi-persistent GuiConfig ctrls are the exception rather than the rule (wx.Panel "hack" above); i.e., they become PyDeadObject
-        # try:
-        return w.GetValue()
-        # except AttributeError:
-        #  if isinstance(w, wx.Panel): #The HSTP_DirBrowseButton control and the underlying wx control will return a GetValue in the "try" block.  This is for wx.Panel's that don't return a value
-        #      print "returning the wx.Panel instance from gui config"
-        #      raise Exception("tst")
-        #      return w #we shouldn't be doing this, if the window instance is needed it should be gotten by the .windows.WinName syntax
-        #  else:
-        #      pass # e.g., for N/A button ctrls
+        return self._value_adapters.get(w)
 
     def __getattr__(self, key):
         # Using the __getattr__ method is a little dangerous, if we're setting
@@ -423,91 +654,9 @@ class GuiConfig:
             raise KeyError("GuiConfig instance has no key '%s'" % str(key))
         self.SetWindowValue(w, value)
 
-    @staticmethod
-    def SetWindowValue(w, value):
-        if isinstance(w, wx.ComboBox):  # This is a subclass of wx.Choice -- so check ComboBox and use GetValue first
-            if value is None:
-                value = ""
-            w.SetValue(value)
-        elif isinstance(w, wx.CheckListBox):
-            if value is None:
-                value = ""
-            w.SetCheckedStrings(value)
-        elif isinstance(w, (wx.RadioBox, wx.Choice)):
-            if value is None:
-                try:
-                    w.SetStringSelection("")
-                except:
-                    pass
-            if value is not None:
-                w.SetStringSelection(value)
-        elif isinstance(w, wx.StaticText):
-            try:
-                if value is None:
-                    value = ""
-                w.SetLabel(value)
-            except:
-                w.SetLabel(str(value))
-        elif isinstance(w, wx.CheckBox):
-            if w.Is3State():  # note: for tri-mode checkboxes, Set3StateValue(False)==Set3StateValue(wx.CHK_UNCHECKED)
-                if value is None:
-                    value = wx.CHK_UNCHECKED
-                w.Set3StateValue(value)  # wx.CHK_CHECKED,wx.CHK_UNCHECKED,wx.CHK_UNDETERMINED
-            else:
-                if value is None:
-                    value = False
-                w.SetValue(value)
-        elif isinstance(w, (CalendarCtrl, GenericDatePickerCtrl)):
-            if value is not None:
-                if not isinstance(value, (str)):  # datetime object?
-                    value = value.isoformat()
-                # code from s100py.s1xx for decent iso parsing, better than python 3.7 builtin  function too.
-                re_date = r"(?P<year>\d{4})[-]?(?P<month>\d{2})[-]?(?P<day>\d{2})"
-                re_time = r"(?P<hour>\d{2})[: -]?(?P<minute>\d{2})[:-]?(?P<second>\d{2})(?P<decimal_sec>\.\d+)?"
-                re_timezone = r"(?P<tz>(Z|(?P<tz_hr>[+-]\d{2})[:]?(?P<tz_min>\d{2})?))?"
-                re_time_with_zone = re_time + re_timezone
-                re_full_datetime = re_date + "T?" + re_time_with_zone
-                re_date_optional_time = re_date + "T?(" + re_time_with_zone + ")?"
-                match = re.match(re_date_optional_time, value).groupdict()
-                # if match:
-                #     decimal_sec = int(float(match['decimal_sec']) * 1000000) if match['decimal_sec'] else 0
-                #     val = datetime.datetime(int(match['year']), int(match['month']), int(match['day']),
-                #                             int(match['hour']), int(match['minute']), int(match['second']),
-                #                             decimal_sec, tzinfo=zone)
-
-                if isinstance(w, CalendarCtrl):
-                    try:  # bug in Calendar control is not refreshing the month dropdown box (when year is different but month was same) jitter the month to make th display refresh
-                        w.SetDate(wx.DateTime.FromDMY(int(match['day']), int(match['month']) - 2, int(match['year'])))
-                    except:
-                        pass
-                    try:
-                        w.SetDate(wx.DateTime.FromDMY(int(match['day']), int(match['month']), int(match['year'])))
-                    except:
-                        pass
-                    w.SetDate(wx.DateTime.FromDMY(int(match['day']), int(match['month']) - 1, int(match['year'])))
-                else:
-                    w.SetValue(wx.DateTime.FromDMY(int(match['day']), int(match['month']) - 1, int(match['year'])))
-            else:  # Trying to re-initialize the control
-                if isinstance(w, GenericDatePickerCtrl):
-                    w.SetValue(wx.DateTime())  # send an invalid time object which clears the control
-                else:
-                    w.SetDate()  # @todo this will probably raise an exception -- need to fix
-        else:
-            try:
-                try:
-                    w.SetValue(value)
-                except (TypeError, ValueError):  # IntCtrl raises a ValueError if a long is passed in (like 1L )
-                    try:
-                        uv = "" if value is None else str(value)
-                        w.SetValue(uv)  # most controls like strings, in case user sent an integer etc.
-                    except (TypeError, ValueError):
-                        # traceback.print_exc()
-                        uv = 0 if value is None else int(value)
-                        w.SetValue(int(value))  # spin controls want integers, perhaps we have a string here
-            except:  # catch all; including PyDeadObject bugfix
-                # traceback.print_exc()
-                print("Error while trying to setitem in GuiConfig:")
-                print(w.GetName(), value)  # this shouldn't be too silent -- it's really a bug that needs to be found if it gets here.
+    @classmethod
+    def SetWindowValue(cls, w, value):
+        cls._value_adapters.set(w, value)
 
     def __setattr__(self, key, value):
         try:
@@ -523,7 +672,54 @@ class GuiConfig:
         return '{' + ', '.join(L) + '}'
 
 
+def benchmark_traversal(sizes=(10, 1000, 10000), repeat=5):
+    '''Times walking window trees of the given sizes with lightweight stand-in windows (fan out of 10) and a
+    chain as deep as the largest size: building the full list, finding the last window by a linear search and
+    by the win_dict index.  Returns {(shape, size): {test: seconds}} and prints a table.
+    '''
+    import timeit
+
+    class BenchWindow:
+        def __init__(self, name):
+            self.name = name
+            self.children = []
+
+        def GetName(self):
+            return self.name
+
+        def GetChildren(self):
+            return self.children
+
+    def make_tree(n, fanout):
+        nodes = [BenchWindow('w0')]
+        for i in range(1, n):
+            w = BenchWindow('w%d' % i)
+            nodes[(i - 1) // fanout].children.append(w)
+            nodes.append(w)
+        return nodes[0], nodes[-1].name
+
+    results = {}
+    trees = [('tree', n, 10) for n in sizes] + [('chain', max(sizes), 1)]
+    for shape, n, fanout in trees:
+        root, last = make_tree(n, fanout)
+        windows = win_dict(root)
+        tests = {'list': lambda: getAllChildren(root, True),
+                 'search': lambda: next(w for w in iterAllChildren(root, True) if w.GetName() == last),
+                 'index': lambda: windows[last]}
+        windows[last]  # build the index outside the timing
+        results[(shape, n)] = times = {}
+        for name, func in tests.items():
+            number = max(1, 20000 // n)
+            times[name] = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+        print('%-6s %6d windows: ' % (shape, n) + '  '.join('%s %.3g ms' % (k, v * 1000) for k, v in times.items()))
+    return results
+
+
 if __name__ == '__main__':
+    import sys
+    if '--benchmark' in sys.argv:
+        benchmark_traversal()
+        sys.exit(0)
 
     print("Running a test of the GuiConfig class")
 
@@ -1,19 +1,352 @@
 #!/usr/bin/env python
 
+import asyncio
+import functools
+import itertools
+import math
 import multiprocessing
-import win32api
-import win32con
+import os
+import queue
+import struct
+import sys
+import threading
+import time
 
 import wx
 
-from .PyCGProgress import PyProgress
-from HSTB.shared import RegistryHelpers
+from .PyCGProgress import PyProgress, RateStats
+from .ProgressTrace import ProgressTrace
+from . import Settings
 
 # you have to use "with" statements when using the progress classes.
 # An exception will hang the program with the other progress processes still alive
 # see demo code at bottom.
 
 
+class ProgressCancelled(Exception):
+    '''Raised from Update when the user cancelled the dialog and the progress was made with raise_on_cancel=True.'''
+
+
+def MergeBarValues(data, bars):
+    '''Fold one update's bar values (see MultiProgress.Update) into data, which holds the combined state.
+    The value always takes the latest, captions/labels only change when a non-empty one is given and limits
+    when one is given (not None, 0 is a valid limit).
+    '''
+    for b, bar in enumerate(bars):
+        while len(data) <= b:
+            data.append([])
+        merged = data[b]
+        for i, v in enumerate(bar):
+            if i >= len(merged):
+                merged.append(v)
+            elif i == 0 or (v if i in (1, 2) else v is not None):
+                merged[i] = v
+    return data
+
+
+class UpdateThrottle:
+    '''Coalesces progress updates on the sending side so tight loops don't pay a pickle and pipe write per call.
+    Only the latest state of each bar is kept and handed to send() at most every interval seconds,
+    immediately when a caption or label changes, and on Flush/Close (MultiProgress.Close closes it).
+    An update held back is sent by a helper thread once the interval is up, so the last value before a long
+    stall still shows.
+    '''
+
+    def __init__(self, send, interval=0.05):
+        self.send = send
+        self.interval = interval
+        self._pending = None
+        self._last = 0.0
+        self._labels = {}  # (bar, index) -> caption/label last sent
+        self._lock = threading.Lock()  # DLL callbacks can arrive on other threads
+        self._wake = threading.Condition(self._lock)
+        self._thread = None
+        self._closed = False
+
+    def _changed_text(self, bars):
+        for b, bar in enumerate(bars):
+            for i in (1, 2):
+                try:
+                    v = bar[i]
+                except IndexError:
+                    break
+                if v and self._labels.get((b, i)) != v:
+                    self._labels[(b, i)] = v
+                    return True
+        return False
+
+    def Update(self, bars):
+        with self._lock:
+            if self._pending is None:
+                self._pending = []
+            MergeBarValues(self._pending, bars)
+            now = time.monotonic()
+            if self._changed_text(bars) or now - self._last >= self.interval:
+                self._flush(now)
+            elif not self._closed:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._FlushLate, name='UpdateThrottle')
+                    self._thread.daemon = True
+                    self._thread.start()
+                self._wake.notify()
+
+    def _FlushLate(self):
+        with self._lock:
+            while not self._closed:
+                if self._pending is None:
+                    self._wake.wait()
+                    continue
+                delay = self._last + self.interval - time.monotonic()
+                if delay > 0:
+                    self._wake.wait(delay)
+                    continue
+                try:
+                    self._flush(time.monotonic())
+                except (IOError, OSError, EOFError):
+                    return  # the dialog is gone
+
+    def Flush(self):
+        with self._lock:
+            self._flush(time.monotonic())
+
+    def Close(self):
+        '''Flush and stop the helper thread.'''
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+            self._flush(time.monotonic())
+
+    def _flush(self, now):
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            self._last = now
+            self.send(pending)
+
+
+class PipeReader:
+    '''Dialog side of the default Pipe channel, drains everything sent since the last read.'''
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def cancel(self):
+        try:
+            self.conn.send('cancel')
+        except (IOError, OSError):
+            pass  # worker already closed
+
+    def read(self):
+        '''Returns the combined bar values or None if nothing arrived.  Raises EOFError once the sender closed.'''
+        if not self.conn.poll():
+            return None
+        data = []
+        while self.conn.poll():
+            # since we may be skipping the display of message we need to track any caption/label changes and make sure they take effect
+            MergeBarValues(data, self.conn.recv())
+        return data
+
+
+class QueueReader:
+    '''Reader for an in-process dialog, worker threads send() updates through a thread-safe queue.'''
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.closed = False
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def send(self, bars):
+        self.queue.put(bars)
+
+    def close(self):
+        self.queue.put(None)
+
+    def read(self):
+        data = None
+        while not self.closed:
+            try:
+                bars = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if bars is None:
+                self.closed = True
+            else:
+                data = MergeBarValues([] if data is None else data, bars)
+        if data is None and self.closed:
+            raise EOFError('progress closed')
+        return data
+
+
+_attach_lock = threading.Lock()  # see SharedProgressState.__init__
+
+
+class SharedProgressState:
+    '''Progress bar state kept in a multiprocessing.shared_memory block, the transport='shm' alternative to the Pipe.
+    The writer updates the block in place under a sequence counter (odd while a write is in progress) and the
+    dialog copies the latest consistent snapshot on its timer -- no syscall or pickle per update and no back-pressure
+    when the GUI process is busy.  Captions and labels are stored utf-8 encoded and cut at text_size bytes.
+    '''
+    header = struct.Struct('<QIII')  # sequence, number of bars, closed flag, cancelled flag
+    text_size = 256
+    bar = struct.Struct('<dddH%dsH%ds' % (text_size, text_size))  # value, max, min, caption, label
+
+    def __init__(self, nbars, name=None, create=True):
+        from multiprocessing import shared_memory
+        size = self.header.size + nbars * self.bar.size
+        if create:
+            with _attach_lock:
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        elif sys.version_info >= (3, 13):
+            self.shm = shared_memory.SharedMemory(name=name, track=False)  # the creator owns the block
+        else:
+            # attaching registers the block with this process's resource tracker, which would warn about a leak and
+            # unlink it when this process exits -- the creator owns it.  Unregistering afterwards isn't an option,
+            # a process started by multiprocessing shares the creator's tracker and would drop its registration.
+            from multiprocessing import resource_tracker
+            with _attach_lock:
+                register = resource_tracker.register
+                resource_tracker.register = lambda name, rtype: None
+                try:
+                    self.shm = shared_memory.SharedMemory(name=name)
+                finally:
+                    resource_tracker.register = register
+        self.name = self.shm.name
+        self.nbars = nbars
+        self._state = []
+        self._seen = 0
+        if create:
+            self.header.pack_into(self.shm.buf, 0, 0, nbars, 0, 0)
+            for b in range(nbars):
+                self._pack(b, [])
+
+    def _pack(self, b, merged):
+        nan = float('nan')
+        values = [nan, '', '', nan, nan]
+        for i, v in enumerate(merged[:5]):
+            if v is not None and v != '':
+                values[i] = v
+        caption, label = [v.encode('utf-8')[:self.text_size] for v in values[1:3]]
+        self.bar.pack_into(self.shm.buf, self.header.size + b * self.bar.size,
+                           float(values[0]), float(values[3]), float(values[4]), len(caption), caption, len(label), label)
+
+    def write(self, bars):
+        '''Writer side, bars as in MultiProgress.Update.'''
+        MergeBarValues(self._state, bars)
+        buf = self.shm.buf
+        seq = self.header.unpack_from(buf, 0)[0]
+        struct.pack_into('<Q', buf, 0, seq + 1)
+        for b, bar in enumerate(bars[:self.nbars]):
+            if bar:
+                self._pack(b, self._state[b])
+        struct.pack_into('<Q', buf, 0, seq + 2)
+
+    def read(self):
+        '''Reader side, returns the bar values if they changed since the last read, otherwise None.
+        Raises EOFError once the writer closed and the final state has been returned.
+        '''
+        for attempt in range(10):
+            seq = self.header.unpack_from(self.shm.buf, 0)[0]
+            if seq & 1:
+                continue
+            snapshot = bytes(self.shm.buf)
+            if self.header.unpack_from(snapshot, 0)[0] == seq:
+                break
+        else:
+            return None  # writer is busy, try again next tick
+        closed = self.header.unpack_from(snapshot, 0)[2]
+        if seq == self._seen:
+            if closed:
+                raise EOFError('progress closed')
+            return None
+        self._seen = seq
+        data = []
+        for b in range(self.nbars):
+            value, vmax, vmin, nc, caption, nl, label = self.bar.unpack_from(snapshot, self.header.size + b * self.bar.size)
+            if math.isnan(value):
+                data.append([])
+                continue
+            data.append([value, caption[:nc].decode('utf-8', 'ignore'), label[:nl].decode('utf-8', 'ignore'),
+                         None if math.isnan(vmax) else vmax, None if math.isnan(vmin) else vmin])
+        return data
+
+    def cancel(self):
+        '''Reader side, tells the writer the user cancelled.'''
+        struct.pack_into('<I', self.shm.buf, 16, 1)
+
+    @property
+    def cancelled(self):
+        return bool(struct.unpack_from('<I', self.shm.buf, 16)[0])
+
+    def close(self, unlink=False):
+        if unlink:
+            struct.pack_into('<I', self.shm.buf, 12, 1)  # closed flag, the reader finishes after its next read
+        self.shm.close()
+        if unlink:
+            try:
+                self.shm.unlink()  # the name goes away, the dialog's mapping stays valid (no-op on Windows)
+            except FileNotFoundError:
+                pass
+
+
+class SharedMemoryReader:
+    '''Picklable handle passed to the dialog process, attaches to the SharedProgressState block on first read.'''
+
+    def __init__(self, name, nbars):
+        self.name = name
+        self.nbars = nbars
+        self.state = None
+
+    def __getstate__(self):
+        return {'name': self.name, 'nbars': self.nbars, 'state': None}
+
+    def read(self):
+        if self.state is None:
+            try:
+                self.state = SharedProgressState(self.nbars, self.name, create=False)
+            except FileNotFoundError:
+                raise EOFError('progress already closed')
+        return self.state.read()
+
+    def cancel(self):
+        if self.state is not None:
+            self.state.cancel()
+
+
+class ProgressDialogHost:
+    '''One PyProgress fed from a reader (PipeReader, SharedMemoryReader or ServerReader).'''
+
+    def __init__(self, reader, bars, title='Progress', style=wx.PD_ELAPSED_TIME | wx.PD_APP_MODAL | wx.PD_AUTO_HIDE, loc=None):
+        self.reader = reader
+        self.position = loc
+        self.done = False
+        self.dlg = PyProgress(bars, title=title, style=style, loc=loc)
+
+    def Poll(self):
+        '''Show whatever the reader has, returns False once the dialog has been closed.'''
+        if self.done:
+            return False
+        try:
+            data = self.reader.read()
+            if data:
+                self.dlg.Update(*data)
+                self.position = self.dlg.GetPosition()
+            if self.dlg.WasCancelled():
+                self.reader.cancel()  # let the worker know
+                raise IOError('user stopped')
+        except (IOError, EOFError):
+            # connection closed -- close the window
+            self.Close()
+        return not self.done
+
+    def Close(self):
+        if not self.done:
+            self.done = True
+            self.dlg.Close()
+            self.dlg.Destroy()
+
+
 class ProgApp(wx.App):
     name = "Progbar\\position"
 
@@ -27,12 +360,12 @@ class ProgApp(wx.App):
         [[0,9,"test"], [0,20,"test2"]]
         Generates two progress bars with the top on ranging from 0 to 9 and the bottom ranging from 0 to 20 with the
         respective text inside the progress bars.
+        conn is the child end of a Pipe or any reader with a read() method (see SharedMemoryReader).
         '''
         self.dlg_position = self.RetrievePos()
-        self.dlg = PyProgress(bars,
-                              title=title,
-                              style=style,
-                              loc=self.dlg_position)
+        reader = PipeReader(conn) if hasattr(conn, 'poll') else conn
+        self.host = ProgressDialogHost(reader, bars, title, style, self.dlg_position)
+        self.dlg = self.host.dlg
         # style = wx.PD_AUTO_HIDE
         # |wx.PD_CAN_ABORT
         # | wx.PD_APP_MODAL
@@ -41,91 +374,315 @@ class ProgApp(wx.App):
         # | wx.PD_ESTIMATED_TIME
         # | wx.PD_REMAINING_TIME
         ID_Timer = wx.NewId()
-        self.conn = conn
         self.AutoTimer = wx.Timer(self, ID_Timer)
         self.Bind(wx.EVT_TIMER, self.OnTimer, id=ID_Timer)
         self.AutoTimer.Start(50)
         return True
 
     def OnTimer(self, event):
-        try:
-            # print 'tick'
-            if self.conn.poll():
-                data = []
-                keepGoing = True
-                while self.conn.poll():
-                    bars = self.conn.recv()
-                    # since we may be skipping the display of message we need to track any caption/label changes and make sure they take effect
-                    for b, bar in enumerate(bars):
-                        if len(data) <= b:
-                            data.append([])
-                        try:
-                            for i, v in enumerate(bar):
-                                if v or i == 0:  # replace caption/label if non-empty string (always replace value)
-                                    data[b][i] = v
-                        except:
-                            data[b] = bar
-                keepGoing = self.dlg.Update(*data)
-                self.dlg_position = self.dlg.GetPosition()
-                if not keepGoing:
-                    raise IOError('user stopped')
-        except (IOError, EOFError):
-            # connection closed -- close the window
+        if not self.host.Poll():
             self.AutoTimer.Stop()
-            self.dlg.Close()
-            self.dlg.Destroy()
-            # self.Close()
-        # print 'leaving timer'
+        self.dlg_position = self.host.position
 
     def OnExit(self):
         self.SavePos()
         return 0
 
     def SavePos(self):
-        # find the max bounds of the screen (less twenty to make sure some of the window is visible, caption can be slightly off screen)
-        if win32api.GetSystemMetrics(win32con.SM_CXVIRTUALSCREEN) != 0:
-            minx = win32api.GetSystemMetrics(win32con.SM_XVIRTUALSCREEN) - 20
-            miny = win32api.GetSystemMetrics(win32con.SM_YVIRTUALSCREEN) - 20
-            maxx = win32api.GetSystemMetrics(win32con.SM_CXVIRTUALSCREEN) + minx
-            maxy = win32api.GetSystemMetrics(win32con.SM_CYVIRTUALSCREEN) + miny
-        else:  # not NT 5.0+ or win98+
-            minx, miny = -20, -20
-            maxx = win32api.GetSystemMetrics(win32con.SM_CXSCREEN) + minx
-            maxy = win32api.GetSystemMetrics(win32con.SM_CYSCREEN) + miny
         pos = self.dlg_position
-        if (pos[0] >= minx and pos[0] <= maxx) and (pos[1] >= miny and pos[1] <= maxy):   # Don't save if Pydro is minimized to Task Bar, or window is off screen
-            RegistryHelpers.SaveDWORDToRegistry(self.name, "PosX", pos[0])
-            RegistryHelpers.SaveDWORDToRegistry(self.name, "PosY", pos[1])
+        if pos and OnScreen(pos):   # Don't save if Pydro is minimized to Task Bar, or window is off screen
+            settings = Settings.GetSettings()
+            settings.set(self.name, "PosX", pos[0])
+            settings.set(self.name, "PosY", pos[1])
+            settings.flush()
 
     def RetrievePos(self):
-        x = RegistryHelpers.GetDWORDFromRegistry(self.name, "PosX", 0)
-        y = RegistryHelpers.GetDWORDFromRegistry(self.name, "PosY", 0)
-        if win32api.GetSystemMetrics(win32con.SM_CXVIRTUALSCREEN) != 0:
-            minx = win32api.GetSystemMetrics(win32con.SM_XVIRTUALSCREEN) - 20
-            miny = win32api.GetSystemMetrics(win32con.SM_YVIRTUALSCREEN) - 20
-            maxx = win32api.GetSystemMetrics(win32con.SM_CXVIRTUALSCREEN) + minx
-            maxy = win32api.GetSystemMetrics(win32con.SM_CYVIRTUALSCREEN) + miny
-        else:  # not NT 5.0+ or win98+
-            minx, miny = -20, -20
-            maxx = win32api.GetSystemMetrics(win32con.SM_CXSCREEN) + minx
-            maxy = win32api.GetSystemMetrics(win32con.SM_CYSCREEN) + miny
-        if (x >= minx and x <= maxx) and (y >= miny and y <= maxy):   # Don't save if Pydro is minimized to Task Bar, or window is off screen
+        settings = Settings.GetSettings()
+        x = settings.get(self.name, "PosX", 0)
+        y = settings.get(self.name, "PosY", 0)
+        if OnScreen((x, y)):
             return x, y
         else:
             return (0, 0)
 
 
+def OnScreen(pos, slack=20):
+    '''True if pos is on one of the displays, allowing slack pixels off the edge (the caption can be slightly off screen).'''
+    for n in range(wx.Display.GetCount()):
+        rect = wx.Display(n).GetGeometry()
+        if rect.x - slack <= pos[0] <= rect.x + rect.width and rect.y - slack <= pos[1] <= rect.y + rect.height:
+            return True
+    return False
+
+
 def ProgDialog(conn, bars, title='Progress', style=wx.PD_ELAPSED_TIME | wx.PD_APP_MODAL | wx.PD_ELAPSED_TIME | wx.PD_AUTO_HIDE):
     app = ProgApp(0)
     app.Setup(conn, bars, title, style)
     app.MainLoop()
 
 
+class InProcessDialog:
+    '''Shows a ProgressDialogHost inside the caller's running wx app, polled by a wx.Timer on the GUI thread.
+    Safe to create from a worker thread, the dialog is built via wx.CallAfter.
+    '''
+
+    def __init__(self, reader, bars, title='Progress', style=wx.PD_ELAPSED_TIME | wx.PD_AUTO_HIDE):
+        self.reader = reader
+        self.host = None
+        # app modal would lock the caller's own windows while its worker runs
+        style &= ~wx.PD_APP_MODAL
+        if wx.IsMainThread():
+            self._Open(bars, title, style)
+        else:
+            wx.CallAfter(self._Open, bars, title, style)
+
+    def _Open(self, bars, title, style):
+        self.host = ProgressDialogHost(self.reader, bars, title, style)
+        self.timer = wx.Timer()
+        self.timer.Bind(wx.EVT_TIMER, self.OnTimer)
+        self.timer.Start(50)
+
+    def OnTimer(self, event):
+        if not self.host.Poll():
+            self.timer.Stop()
+
+
+class ServerReader:
+    '''Reader for one dialog hosted by ProgServerApp, the server pushes the updates it receives for it.'''
+
+    def __init__(self, cancel=None):
+        self.data = None
+        self.closed = False
+        self.cancel = cancel or (lambda: None)
+
+    def push(self, bars):
+        if self.data is None:
+            self.data = []
+        MergeBarValues(self.data, bars)
+
+    def read(self):
+        data, self.data = self.data, None
+        if data is None and self.closed:
+            raise EOFError('progress closed')
+        return data
+
+
+class ProgServerApp(ProgApp):
+    '''Long-lived dialog process hosting any number of progress dialogs over one connection.
+    Messages are ('open', id, bars, title, style, reader), ('update', id, bars), ('close', id) and ('quit',).
+    reader is None for updates sent over the connection or a SharedMemoryReader.
+    ('cancelled', id) is sent back when the user cancels a dialog.
+    '''
+    cascade = 30  # pixels each concurrent dialog is offset by
+
+    def Setup(self, conn):
+        self.SetExitOnFrameDelete(False)  # keep serving after the last dialog closes
+        self.conn = conn
+        self.hosts = {}
+        self.dlg_position = self.RetrievePos()
+        ID_Timer = wx.NewId()
+        self.AutoTimer = wx.Timer(self, ID_Timer)
+        self.Bind(wx.EVT_TIMER, self.OnTimer, id=ID_Timer)
+        self.AutoTimer.Start(50)
+        return True
+
+    def Dispatch(self, msg):
+        cmd, args = msg[0], msg[1:]
+        if cmd == 'update':
+            host = self.hosts.get(args[0])
+            if host is not None and isinstance(host.reader, ServerReader):
+                host.reader.push(args[1])
+        elif cmd == 'open':
+            id, bars, title, style, reader = args
+            style &= ~wx.PD_APP_MODAL  # each modal dialog would disable the others, Cancel buttons included
+            n = len(self.hosts)
+            x, y = self.dlg_position
+            reader = reader or ServerReader(functools.partial(self.SendCancelled, id))
+            self.hosts[id] = ProgressDialogHost(reader, bars, title, style,
+                                                (x + n * self.cascade, y + n * self.cascade))
+        elif cmd == 'close':
+            host = self.hosts.get(args[0])
+            if host is not None and isinstance(host.reader, ServerReader):
+                host.reader.closed = True
+        elif cmd == 'quit':
+            raise EOFError('quit')
+
+    def SendCancelled(self, id):
+        if self.conn is not None:
+            try:
+                self.conn.send(('cancelled', id))
+            except (IOError, OSError):
+                pass
+
+    def OnTimer(self, event):
+        if self.conn is not None:
+            try:
+                while self.conn.poll():
+                    self.Dispatch(self.conn.recv())
+            except (IOError, EOFError):
+                # client is gone, let the dialogs finish what they have and shut down
+                self.conn = None
+                for host in self.hosts.values():
+                    if isinstance(host.reader, ServerReader):
+                        host.reader.closed = True
+        for id, host in list(self.hosts.items()):
+            if not host.Poll():
+                del self.hosts[id]
+                if not self.hosts:
+                    self.dlg_position = host.position
+                    self.SavePos()
+        if self.conn is None and not self.hosts:
+            self.AutoTimer.Stop()
+            self.ExitMainLoop()
+
+
+def ProgServer(conn):
+    app = ProgServerApp(0)
+    app.Setup(conn)
+    app.MainLoop()
+
+
+class ProgressServer:
+    '''Client side of a ProgServerApp process, see GetProgressServer.  Thread safe.'''
+
+    def __init__(self):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=ProgServer, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self._ids = itertools.count(1)
+        self._cancelled = set()
+        self._lock = threading.Lock()
+        self.pid = os.getpid()  # only the process that started the server can use it
+
+    def alive(self):
+        if os.getpid() != self.pid:
+            return False  # inherited by a forked worker, the connection belongs to the parent
+        return self.process.is_alive() and not self.conn.closed
+
+    def send(self, msg):
+        with self._lock:
+            self.conn.send(msg)
+
+    def Open(self, bars, title='Progress', style=wx.PD_ELAPSED_TIME | wx.PD_AUTO_HIDE, reader=None):
+        '''Returns the id used to Update and Close the new dialog.  The dialogs are never app modal.'''
+        id = next(self._ids)
+        self.send(('open', id, bars, title, style, reader))
+        return id
+
+    def Update(self, id, bars):
+        self.send(('update', id, bars))
+
+    def Close(self, id):
+        self._cancelled.discard(id)
+        self.send(('close', id))
+
+    def Cancelled(self, id):
+        '''True once the user cancelled dialog id.'''
+        with self._lock:
+            while self.conn.poll():
+                msg = self.conn.recv()
+                if msg[0] == 'cancelled':
+                    self._cancelled.add(msg[1])
+        return id in self._cancelled
+
+    def Shutdown(self):
+        try:
+            self.send(('quit',))
+        except (IOError, OSError):
+            pass
+        self.conn.close()
+        self.process.join(5)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def GetProgressServer():
+    '''The shared progress server, started on first use (and again if it died or this is a forked child of the
+    process that started it).'''
+    global _server
+    with _server_lock:
+        if _server is None or not _server.alive():
+            _server = ProgressServer()
+        return _server
+
+
+def ResolveBackend(backend='auto'):
+    '''The MultiProgress backend 'auto' stands for when called from the current thread.'''
+    if backend == 'auto':
+        app = wx.GetApp()
+        backend = 'inprocess' if app is not None and app.IsMainLoopRunning() and not wx.IsMainThread() else 'server'
+    return backend
+
+
 class MultiProgress:
-    def __init__(self, bars=[[0, 100, 'Progress']], title='Progress', style=wx.PD_ELAPSED_TIME | wx.PD_APP_MODAL | wx.PD_ELAPSED_TIME | wx.PD_AUTO_HIDE, minimize=None):
-        self.parent_conn, self.child_conn = multiprocessing.Pipe()
-        p = multiprocessing.Process(target=ProgDialog, args=(self.child_conn, bars, title, style))
-        p.start()
+    '''throttle is the minimum time in seconds between messages to the dialog, updates in between are coalesced.
+    Use 0 to send every update.
+    transport is 'pipe' (default) or 'shm' to share the bar state through a SharedProgressState block instead,
+    which makes updates cheap enough that the throttle is only applied to the caption/label bookkeeping.
+    backend is 'server' to show the dialog in the shared progress server process (see GetProgressServer),
+    'process' to start a dedicated dialog process like older versions did or 'inprocess' to show it in the caller's
+    own running wx app (see InProcessDialog).  The default 'auto' picks 'inprocess' when called from a worker thread
+    of a running wx app and 'server' otherwise -- work done on the GUI thread itself would starve an in-process dialog.
+    When the user cancels the dialog, cancelled becomes True and, with raise_on_cancel, Update raises ProgressCancelled.
+    The dialog is asked about a cancel at most every cancel_interval seconds.
+    trace is a filename or ProgressTrace to record the updates sent to the dialog in, see ProgressTrace.py for the summary tool.
+    '''
+    cancel_interval = 0.1
+
+    def __init__(self, bars=[[0, 100, 'Progress']], title='Progress', style=wx.PD_ELAPSED_TIME | wx.PD_APP_MODAL | wx.PD_ELAPSED_TIME | wx.PD_AUTO_HIDE, minimize=None, throttle=0.05, transport='pipe', backend='auto', raise_on_cancel=False, trace=None):
+        self.shared = self.parent_conn = self.server = self.queue_reader = self.trace = None
+        self._gone = False  # the dialog process went away, nothing more to send
+        self._cancel_polled = 0.0
+        if trace is not None:
+            self.trace_owned = not isinstance(trace, ProgressTrace)
+            self.trace = ProgressTrace(trace) if self.trace_owned else trace
+            self.trace_id = self.trace.Open(title, bars)
+        self.raise_on_cancel = raise_on_cancel
+        self._cancelled = False
+        self.stats = [RateStats(bar[0], bar[1]) for bar in bars]
+        reader = None
+        if transport == 'shm':
+            self.shared = SharedProgressState(len(bars))
+            reader = SharedMemoryReader(self.shared.name, len(bars))
+            send, throttle = self.shared.write, 0
+        elif transport != 'pipe':
+            raise ValueError("transport must be 'pipe' or 'shm', not %r" % (transport,))
+        backend = ResolveBackend(backend)
+        if backend == 'server':
+            self.server = GetProgressServer()
+            self.id = self.server.Open(bars, title, style, reader)
+            if reader is None:
+                send = functools.partial(self.server.Update, self.id)
+        elif backend == 'process':
+            child_conn = None
+            if reader is None:
+                self.parent_conn, child_conn = multiprocessing.Pipe()
+                send, reader = self.parent_conn.send, child_conn
+            p = multiprocessing.Process(target=ProgDialog, args=(reader, bars, title, style))
+            p.start()
+            if child_conn is not None:
+                child_conn.close()  # only the dialog holds its end, so closing the dialog breaks the pipe and Send sees the cancel
+        elif backend == 'inprocess':
+            if reader is None:
+                self.queue_reader = reader = QueueReader()
+                send = reader.send
+            self.dialog = InProcessDialog(reader, bars, title, style)
+        else:
+            raise ValueError("backend must be 'auto', 'server', 'process' or 'inprocess', not %r" % (backend,))
+        if self.trace is not None:
+            send = self._TracedSend(send, self.trace, self.trace_id)
+        self.throttle = UpdateThrottle(send, throttle)
+        if self.shared is not None:
+            self._poll_cancel = lambda: self.shared.cancelled
+        elif self.server is not None:
+            self._poll_cancel = functools.partial(self.server.Cancelled, self.id)
+        elif self.queue_reader is not None:
+            self._poll_cancel = self.queue_reader.cancelled.is_set
+        else:
+            self._poll_cancel = lambda: self.parent_conn.poll() and self.parent_conn.recv() == 'cancel'
         try:
             self.win = minimize
             while self.win.GetParent():
@@ -143,14 +700,102 @@ class MultiProgress:
 
         [[], [n,'']] # does not modify the first progress bar and only changes the position/value of the second.
         '''
-        self.parent_conn.send(barValues)
+        self.Send(barValues)
+
+    def Send(self, barValues):
+        '''Common path for all the Update flavours: cancel check, rate statistics and the throttled send.'''
+        self.CheckCancel()
+        for b, bar in enumerate(barValues[:len(self.stats)]):
+            if bar:
+                self.stats[b].Add(bar[0], *bar[3:5])
+        if self._gone:
+            return
+        try:
+            self.throttle.Update(barValues)
+        except (IOError, OSError, EOFError):
+            if self.parent_conn is None:
+                raise
+            # a dedicated dialog process exits when the user cancels it, so the pipe breaks
+            self._gone = True
+            self._SetCancelled()
+            self.CheckCancel()
+
+    @staticmethod
+    def _TracedSend(send, trace, trace_id):
+        '''Wraps send so the trace records what the throttle passes on rather than every Update call.'''
+        def traced(bars):
+            send(bars)
+            trace.Update(trace_id, bars)
+        return traced
+
+    def GetStats(self, bar=None):
+        '''Rate statistics computed on the worker side (see PyCGProgress.RateStats.Summary), e.g. for logging
+        processing rates per stage.  One dict for bar or a list for all bars.
+        '''
+        if bar is None:
+            return [stats.Summary() for stats in self.stats]
+        return self.stats[bar].Summary()
+
+    @property
+    def cancelled(self):
+        '''True once the user cancelled the dialog, cheap enough to poll from the work loop.'''
+        if not self._cancelled:
+            now = time.monotonic()
+            if now - self._cancel_polled >= self.cancel_interval:  # polling a pipe is a syscall, not for every update
+                self._cancel_polled = now
+                try:
+                    if self._poll_cancel():
+                        self._SetCancelled()
+                except EOFError:
+                    if self.parent_conn is not None:
+                        self._SetCancelled()  # the dialog process exited and closed its end of the pipe, like a broken pipe in Send
+                except (AttributeError, IOError, OSError):
+                    pass  # closed or never fully opened
+        return self._cancelled
+
+    def _SetCancelled(self):
+        if not self._cancelled:
+            self._cancelled = True
+            if self.trace is not None:
+                self.trace.Cancel(self.trace_id)
+
+    def CheckCancel(self):
+        '''Raises ProgressCancelled if the user cancelled and raise_on_cancel was set.'''
+        if self.raise_on_cancel and self.cancelled:
+            raise ProgressCancelled('cancelled by user')
+
+    def Flush(self):
+        '''Send any update held back by the throttle now.'''
+        self.throttle.Flush()
 
     def Close(self):
         try:
             self.win.Iconize(False)
         except:
             pass
-        self.parent_conn.close()
+        try:
+            self.throttle.Close()
+        except (AttributeError, IOError, OSError):
+            pass  # never fully opened or the dialog is already gone
+        if self.parent_conn is not None:
+            self.parent_conn.close()
+        if self.server is not None:
+            try:
+                self.server.Close(self.id)
+            except (IOError, OSError):
+                pass  # server already gone
+            self.server = None
+        if self.queue_reader is not None:
+            self.queue_reader.close()
+            self.queue_reader = None
+        if self.shared is not None:
+            self.shared.close(unlink=True)
+            self.shared = None
+        if self.trace is not None:
+            self.trace.Close(self.trace_id)
+            if self.trace_owned:
+                self.trace.CloseFile()
+            self.trace = None
         # p.join()
 
     def __del__(self):
@@ -170,16 +815,17 @@ class SingleProgress(MultiProgress):
 
     def Update(self, cur=0, barcaption='', bartxt="", newmax=None, newmin=None):
         self.lastPosition = cur
-        self.parent_conn.send([[cur, barcaption, bartxt, newmax, newmin]])
+        self.Send([[cur, barcaption, bartxt, newmax, newmin]])
 
     def DllUpdate(self, cur, tot, txt=''):  # update the top bar via DLL callback
         '''This is the calling syntax used from PeekXTF and MidTierPeek DLLs to the Python functions that update progress bars'''
         self.Update(cur, '', txt, tot)
 
     def Increment(self, i=1):
+        self.CheckCancel()
         try:
             self.lastPosition += i
-            self.parent_conn.send([[self.lastPosition]])
+            self.Send([[self.lastPosition]])
         except:
             pass
 
@@ -199,6 +845,203 @@ class ExcessingProgress(MultiProgress):
         self.Update([[], [cur, '', txt, tot]])
 
 
+class ProgressTask:
+    '''One node of a HierarchicalProgress, made by Subtask.  total is in the task's own units (see Update/Advance),
+    weight is how much of its parent's total the task accounts for.  The fractions are kept incrementally so an
+    update costs O(depth).  Thread safe, every node shares the root's lock and throttled transport.
+    Use as a context manager or call Finish.
+    '''
+
+    def __init__(self, progress, parent, total=100, caption='', weight=0):
+        self.progress = progress
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.total = float(total)
+        self.caption = caption
+        self.weight = weight
+        self.done = 0.0
+        self.fraction = 0.0
+        self.finished = False
+        self._partial = 0.0  # weighted fractions of unfinished subtasks
+
+    def _Attached(self):
+        '''False at the root and once the parent finished, a subtask left unfinished no longer counts towards it.'''
+        return self.parent is not None and not self.parent.finished
+
+    def _recompute(self):
+        old = self.fraction
+        self.fraction = min((self.done + self._partial) / self.total, 1.0) if self.total > 0 else 1.0
+        if self._Attached() and self.fraction != old:
+            self.parent._partial += self.weight * (self.fraction - old)
+            self.parent._recompute()
+
+    def Subtask(self, weight=1, total=100, caption=''):
+        with self.progress._lock:
+            child = ProgressTask(self.progress, self, total, caption, weight)
+        self.progress._Refresh(child)
+        return child
+
+    def Update(self, value=None, caption=None):
+        '''Set the amount done (in units of total) and/or the caption.'''
+        with self.progress._lock:
+            if caption:
+                self.caption = caption
+            if value is not None:
+                self.done = float(value)
+                self._recompute()
+        self.progress._Refresh(self, bool(caption))
+
+    def Advance(self, n=1):
+        with self.progress._lock:
+            self.done += n
+            self._recompute()
+        self.progress._Refresh(self)
+
+    def Finish(self):
+        with self.progress._lock:
+            if self.finished:
+                return
+            self.done, self._partial = self.total, 0.0
+            self._recompute()
+            self.finished = True
+            if self._Attached():  # fold into the parent's own done so it stays exact
+                self.parent._partial -= self.weight
+                self.parent.done += self.weight
+        self.progress._Refresh(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.Finish()
+
+
+class HierarchicalProgress(MultiProgress):
+    '''Progress for nested work: the root task spawns weighted subtasks (and they their own, from any thread)
+    and every parent's percentage follows from its subtasks automatically.
+    Bar n shows a task at depth n, the first one to report at that depth keeps the bar until it finishes.
+    Everything goes through the one throttled MultiProgress transport no matter how many tasks there are.
+        with HierarchicalProgress('Processing', total=3) as prog:
+            for name in ('load', 'excess', 'grid'):
+                with prog.Subtask(1, len(lines), name) as task:
+                    for line in lines:
+                        task.Advance()
+    '''
+
+    def __init__(self, caption='Progress', total=100, levels=2, label='%.0f%%', **vargs):
+        self._lock = threading.RLock()
+        self._shown = [None] * levels
+        MultiProgress.__init__(self, [[0, 100, label] for n in range(levels)], **vargs)
+        self.root = ProgressTask(self, None, total, caption)
+        self._Refresh(self.root, True)
+
+    def Subtask(self, weight=1, total=100, caption=''):
+        return self.root.Subtask(weight, total, caption)
+
+    def Advance(self, n=1):
+        self.root.Advance(n)
+
+    def _Refresh(self, task, caption_changed=False):
+        with self._lock:
+            depth = task.depth
+            if depth >= len(self._shown):
+                task = task.parent
+                while task.depth >= len(self._shown):
+                    task = task.parent
+                depth = task.depth
+            bars = []
+            shown = self._shown[depth]
+            if shown is not task and (shown is None or shown.finished):
+                self._shown[depth] = task
+                for d in range(depth + 1, len(self._shown)):
+                    self._shown[d] = None
+                caption_changed = True
+                bars = [[] for d in range(depth)] + [[0.0] for d in range(depth, len(self._shown))]
+            while task is not None:
+                if self._shown[task.depth] is task:
+                    while len(bars) <= task.depth:
+                        bars.append([])
+                    bars[task.depth] = [task.fraction * 100.0, task.caption if caption_changed else '']
+                caption_changed = False
+                task = task.parent
+            self.Send(bars)
+
+    def Close(self):
+        try:
+            self.root.Finish()
+        except AttributeError:
+            pass  # never fully opened
+        MultiProgress.Close(self)
+
+
+class AsyncProgress:
+    '''asyncio front end for MultiProgress, driving the same PyProgress dialog.
+    Defaults to transport='shm' so an update is a memory write that never waits on the dialog process;
+    opening and closing (which may start the progress server) run in the default executor.
+        async with AsyncProgress([[0, 100, 'Downloading']]) as prog:
+            async for chunk in prog.wrap(response.content.iter_chunked(1 << 16), total=nchunks):
+                ...
+            await prog.update([[50, 'Unpacking']])
+    Other keyword arguments go to MultiProgress (title, raise_on_cancel, trace, ...).
+    '''
+
+    def __init__(self, bars=[[0, 100, 'Progress']], transport='shm', **vargs):
+        self.bars = bars
+        self.vargs = dict(vargs, transport=transport)
+        self.progress = None
+        self.position = [0] * len(bars)
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        # resolve 'auto' here, in the executor every caller would look like a worker thread
+        vargs = dict(self.vargs, backend=ResolveBackend(self.vargs.get('backend', 'auto')))
+        self.progress = await loop.run_in_executor(None, functools.partial(MultiProgress, self.bars, **vargs))
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    async def aclose(self):
+        if self.progress is not None:
+            progress, self.progress = self.progress, None
+            await asyncio.get_running_loop().run_in_executor(None, progress.Close)
+
+    @property
+    def cancelled(self):
+        return self.progress is not None and self.progress.cancelled
+
+    async def update(self, barValues):
+        '''Same barValues as MultiProgress.Update.'''
+        for b, bar in enumerate(barValues[:len(self.position)]):
+            if bar:
+                self.position[b] = bar[0]
+        self.progress.Update(barValues)
+
+    async def advance(self, n=1, bar=0):
+        self.position[bar] += n
+        self.progress.Update([[] for b in range(bar)] + [[self.position[bar]]])
+
+    async def wrap(self, iterable, bar=0, total=None, caption=''):
+        '''Yields from an async (or plain) iterable advancing bar by one per item, like tqdm.
+        total defaults to len(iterable) when it has one and resets the bar's maximum.
+        '''
+        if total is None:
+            try:
+                total = len(iterable)
+            except TypeError:
+                pass
+        self.position[bar] = 0
+        await self.update([[] for b in range(bar)] + [[0, caption, '', total]])
+        if hasattr(iterable, '__aiter__'):
+            async for item in iterable:
+                yield item
+                await self.advance(1, bar)
+        else:
+            for item in iterable:
+                yield item
+                await self.advance(1, bar)
+
+
 class PDFDocProgress(SingleProgress):
     def __init__(self, *args, **vargs):
         SingleProgress.__init__(self, *args, **vargs)
@@ -220,6 +1063,8 @@ class GDALProgress(MultiProgress):
         MultiProgress.__init__(self, [[0, 1000.0, 'Loading Raster']], **args)
 
     def Update(self, cur=None, msg=None, txt=""):
-        self.parent_conn.send([[cur * 1000.0, '', txt]])
+        '''Returns 0 once cancelled, which makes GDAL abort the operation.'''
+        self.Send([[cur * 1000.0, '', txt]])
         if msg:
             print(msg)
+        return 0 if self.cancelled else 1
@@ -0,0 +1,205 @@
+'''
+ProgressTrace.py
+
+Records the updates sent to progress dialogs (see ProgressProcess.MultiProgress(trace=...)) as JSON lines and
+turns a recording into a per-stage timing breakdown -- coarse profiling of long pipelines for free from the
+progress calls that are already there.
+
+Each line is one event with wall clock time t:
+  {"e": "open", "t": ..., "id": "4242.1", "title": "Excessing", "bars": [[0, 100, "Progress"]]}
+  {"e": "update", "t": ..., "id": "4242.1", "bar": 0, "v": 5, "caption": "Reading", "max": 10}
+  {"e": "cancel", "t": ..., "id": "4242.1"}
+  {"e": "close", "t": ..., "id": "4242.1"}
+caption, label, max and min only appear when they were given.  MultiProgress records the updates its throttle
+actually sends, so coalesced updates cost nothing and the update counts are messages to the dialog.
+Several progress handles and processes can append to the same file: records are buffered and written as whole
+lines, each flush a single write to a file opened for appending, and ids are made unique per process.
+
+python -m HSTB.gui.ProgressTrace trace.jsonl  prints the breakdown.
+'''
+
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+
+
+def _jsonable(v):
+    '''json.dumps fallback for numpy scalars and other number-like values passed to Update.'''
+    try:
+        return v.item()
+    except AttributeError:
+        pass
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return str(v)
+
+
+class ProgressTrace:
+    '''Thread safe JSONL writer, path is opened for appending unless a file object is given.
+    Records are buffered and written at most every flush_interval seconds and on Cancel/Close/CloseFile,
+    a path with one os.write per flush so lines from several processes never mix.
+    '''
+    _ids = itertools.count(1)
+    flush_interval = 1.0
+    max_buffered = 1000  # records
+
+    def __init__(self, path):
+        self.file = self.fd = None
+        if hasattr(path, 'write'):
+            self.file = path
+        else:
+            self.fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._flushed = time.monotonic()
+
+    def _write(self, records, flush=False):
+        lines = [json.dumps(record, separators=(',', ':'), default=_jsonable) + '\n' for record in records]
+        with self._lock:
+            self._buffer.extend(lines)
+            now = time.monotonic()
+            if flush or len(self._buffer) >= self.max_buffered or now - self._flushed >= self.flush_interval:
+                self._flush(now)
+
+    def _flush(self, now):
+        data, self._buffer = ''.join(self._buffer), []
+        self._flushed = now
+        if not data:
+            return
+        if self.fd is not None:
+            os.write(self.fd, data.encode('utf-8'))
+        elif self.file is not None:
+            self.file.write(data)
+            self.file.flush()
+
+    def Open(self, title, bars):
+        '''Returns the id to pass to the other calls.'''
+        id = '%d.%d' % (os.getpid(), next(self._ids))
+        self._write([{'e': 'open', 't': time.time(), 'id': id, 'title': title, 'bars': bars}])
+        return id
+
+    def Update(self, id, barValues):
+        t = time.time()
+        records = []
+        for b, bar in enumerate(barValues):
+            if bar:
+                record = {'e': 'update', 't': t, 'id': id, 'bar': b, 'v': bar[0]}
+                for key, v in zip(('caption', 'label', 'max', 'min'), bar[1:5]):
+                    if v is not None and v != '':
+                        record[key] = v
+                records.append(record)
+        self._write(records)
+
+    def Cancel(self, id):
+        self._write([{'e': 'cancel', 't': time.time(), 'id': id}], flush=True)
+
+    def Close(self, id):
+        self._write([{'e': 'close', 't': time.time(), 'id': id}], flush=True)
+
+    def CloseFile(self):
+        with self._lock:
+            self._flush(time.monotonic())
+            if self.fd is not None:
+                os.close(self.fd)
+                self.fd = None
+            if self.file is not None:
+                self.file.flush()
+                self.file = None
+
+
+def ReadTrace(path):
+    '''Returns the events of a trace file in time order, skipping a partly written last line.'''
+    events = []
+    with open(path) as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                pass
+    events.sort(key=lambda e: e['t'])
+    return events
+
+
+def SummarizeTrace(events):
+    '''Per-stage timing from trace events, a stage being one caption of one bar of one progress dialog.
+    Returns a list of dicts (title, bar, caption, start, duration, updates, first, last, rate, cancelled)
+    ordered by start time, start relative to the first event.
+    '''
+    if not events:
+        return []
+    t0 = events[0]['t']
+    titles = {}
+    current = {}  # (id, bar) -> open stage
+    stages = []
+
+    def finish(key, t):
+        stage = current.pop(key, None)
+        if stage is not None:
+            stage['duration'] = t - stage['start']
+            span = stage['duration']
+            stage['rate'] = (stage['last'] - stage['first']) / span if span > 0 else None
+            stage['start'] -= t0
+
+    for e in events:
+        id, t = e['id'], e['t']
+        if e['e'] == 'open':
+            titles[id] = (e.get('title', ''), [bar[2] if len(bar) > 2 else '' for bar in e.get('bars', [])])
+        elif e['e'] == 'update':
+            key = (id, e['bar'])
+            title, captions = titles.get(id, ('', []))
+            stage = current.get(key)
+            caption = e.get('caption') or (stage['caption'] if stage else
+                                           captions[e['bar']] if e['bar'] < len(captions) else '')
+            if stage is None or caption != stage['caption'] or e['v'] < stage['last']:
+                finish(key, t)
+                stage = current[key] = {'title': title, 'bar': e['bar'], 'caption': caption, 'start': t,
+                                        'updates': 0, 'first': e['v'], 'last': e['v'], 'cancelled': False}
+                stages.append(stage)
+            stage['updates'] += 1
+            stage['last'] = e['v']
+            stage['end'] = t
+        elif e['e'] == 'cancel':
+            for key in current:
+                if key[0] == id:
+                    current[key]['cancelled'] = True
+        elif e['e'] == 'close':
+            for key in [key for key in current if key[0] == id]:
+                finish(key, t)
+    for key in list(current):
+        finish(key, current[key]['end'])
+    for stage in stages:
+        del stage['end']
+    return stages
+
+
+def FormatSummary(stages):
+    lines = ['%10s %10s  %-4s %10s %8s  %s' % ('start', 'seconds', 'bar', 'rate/s', 'updates', 'stage')]
+    for s in stages:
+        name = ' / '.join(v for v in (s['title'], s['caption']) if v)
+        if s['cancelled']:
+            name += ' (cancelled)'
+        rate = '%10.4g' % s['rate'] if s['rate'] is not None else '%10s' % '-'
+        lines.append('%10.3f %10.3f  %-4d %s %8d  %s' % (s['start'], s['duration'], s['bar'], rate, s['updates'], name))
+    total = {}
+    for s in stages:
+        if s['bar'] == 0:
+            total[s['title']] = total.get(s['title'], 0.0) + s['duration']
+    if total:
+        lines.append('')
+        lines.extend('%10.3f  %s' % (seconds, title) for title, seconds in sorted(total.items(), key=lambda kv: -kv[1]))
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('usage: python -m HSTB.gui.ProgressTrace trace.jsonl [...]')
+        sys.exit(1)
+    events = []
+    for path in sys.argv[1:]:
+        events.extend(ReadTrace(path))
+    events.sort(key=lambda e: e['t'])
+    print(FormatSummary(SummarizeTrace(events)))
@@ -41,8 +41,11 @@ Other options include:
   - Modifying the number of steps the spinning bar performs before a forward
     (or backward) loop reverses.
 
-PyProgress can optionally display a Cancel button, and a wx.StaticText which
-outputs the elapsed time from the starting of the process.
+PyProgress can optionally display a Cancel button, and wx.StaticTexts which
+output the elapsed time from the starting of the process and (with
+wx.PD_ESTIMATED_TIME/wx.PD_REMAINING_TIME) the estimated total time, the
+remaining time and the rate of the top bar.  The smoothed rate of every bar is
+available from GetStats, see RateStats.
 
 
 Supported Platforms
@@ -86,6 +89,69 @@ LAYOUT_MARGIN = 8
 from . import ColorProgress
 import time
 
+
+class RateStats(object):
+    """
+    Exponentially smoothed rate (units/s) and time remaining of one progress value.
+    The weight of older samples halves every `halflife` seconds, samples closer
+    than `min_interval` are folded into the next one so bursts don't spike the rate.
+    The statistics restart when the value goes backwards (a bar being reused).
+    """
+
+    def __init__(self, vmin=0, vmax=100, halflife=5.0, min_interval=0.1):
+        self.vmin, self.vmax = vmin, vmax
+        self.halflife = halflife
+        self.min_interval = min_interval
+        self.Reset()
+
+    def Reset(self, value=None, t=None):
+        self.start_t = self.last_t = t
+        self.start_v = self.last_v = self.value = value
+        self.rate = None
+
+    def Add(self, value, vmax=None, vmin=None, t=None):
+        """ Record a new value (and optionally new limits) at time t, default now. """
+        if vmax is not None:
+            self.vmax = vmax
+        if vmin is not None:
+            self.vmin = vmin
+        if t is None:
+            t = time.time()
+        if self.last_t is None or value < self.value:
+            self.Reset(value, t)
+            return
+        self.value = value
+        dt = t - self.last_t
+        if dt < self.min_interval:
+            return
+        inst = (value - self.last_v) / dt
+        if self.rate is None:
+            self.rate = inst
+        else:
+            self.rate += (1.0 - 0.5 ** (dt / self.halflife)) * (inst - self.rate)
+        self.last_t, self.last_v = t, value
+
+    def Elapsed(self, t=None):
+        if self.start_t is None:
+            return 0.0
+        return (time.time() if t is None else t) - self.start_t
+
+    def Remaining(self):
+        """ Seconds left at the smoothed rate, None while unknown. """
+        if not self.rate or self.rate <= 0 or self.value is None:
+            return None
+        return max(self.vmax - self.value, 0) / self.rate
+
+    def Summary(self, t=None):
+        """ dict of value, vmin, vmax, rate (smoothed), average (overall rate), elapsed and remaining seconds. """
+        elapsed = self.Elapsed(t)
+        average = None
+        if elapsed > 0 and self.value is not None:
+            average = (self.value - self.start_v) / elapsed
+        return {'value': self.value, 'vmin': self.vmin, 'vmax': self.vmax, 'rate': self.rate,
+                'average': average, 'elapsed': elapsed, 'remaining': self.Remaining()}
+
+
 # Class PyProgress
 # ---------------------------------------------------------------------------- #
 
@@ -130,6 +196,7 @@ class PyProgress(wx.Dialog):
 
         self.Msgs = []
         self.CGProgress = []
+        self.Stats = []
         sizeDlg = wx.Size()
         for pmin, pmax, txt in barMinMaxTxt:
             self.Msgs.append(wx.StaticText(self, wx.ID_ANY, message))
@@ -141,6 +208,7 @@ class PyProgress(wx.Dialog):
             self.CGProgress.append(ColorProgress.ColorProgress(self, -1, style=0))  # CGProgClass(self.sbar, -1, style=0)
             prog = self.CGProgress[-1]
             self.SetupProgressBar(prog, pmin, pmax, txt)
+            self.Stats.append(RateStats(pmin, pmax))
             prog.ShowDosPrint()
             prog.ShowPercent()
             # prog.SetText("%.1f%%")
@@ -152,7 +220,7 @@ class PyProgress(wx.Dialog):
             sizeDlg.y += 2 * LAYOUT_MARGIN + sizeGauge.y
 
         # create the estimated/remaining/total time zones if requested
-        self._elapsed = None
+        self._elapsed = self._estimated = self._remaining = self._rate = None
         self._display_estimated = self._last_timeupdate = self._break = 0
         self._ctdelay = 0
 
@@ -164,13 +232,25 @@ class PyProgress(wx.Dialog):
 
             nTimeLabels += 1
             self._elapsed = self.CreateLabel("Elapsed time : ", sizer)
+
+        if style & wx.PD_ESTIMATED_TIME:
+
+            nTimeLabels += 1
+            self._estimated = self.CreateLabel("Estimated time : ", sizer)
+
+        if style & wx.PD_REMAINING_TIME:
+
+            nTimeLabels += 2
+            self._remaining = self.CreateLabel("Remaining time : ", sizer)
+            self._rate = self.CreateLabel("Rate : ", sizer)
+
+        if nTimeLabels > 0:
+
             ID_Timer = wx.NewId()
             self.AutoTimer = wx.Timer(self, ID_Timer)
             self.Bind(wx.EVT_TIMER, self.OnTimer, id=ID_Timer)
             self.AutoTimer.Start(100)
 
-        if nTimeLabels > 0:
-
             label = wx.StaticText(self, -1, "")
             # set it to the current time
             self._timeStart = time.time()
@@ -286,6 +366,7 @@ class PyProgress(wx.Dialog):
                     pass
                 val = v[0]
                 self.CGProgress[i].position = val
+                self.Stats[i].Add(val, self.CGProgress[i].max, self.CGProgress[i].min)
                 try:
                     newmsg = v[1]
                     if newmsg and newmsg != self.Msgs[i].GetLabel():
@@ -303,12 +384,21 @@ class PyProgress(wx.Dialog):
         return self._state != Canceled
 
     def OnTimer(self, event):
+        elapsed = time.time() - self._timeStart
+        if self._last_timeupdate < elapsed:
+            self._last_timeupdate = elapsed
         if self._elapsed:
-            elapsed = time.time() - self._timeStart
-            if self._last_timeupdate < elapsed:
-                self._last_timeupdate = elapsed
-
             self.SetTimeLabel(elapsed, self._elapsed)
+        if self.Stats and (self._estimated or self._remaining):
+            remaining = self.Stats[0].Remaining()
+            if self._estimated:
+                self.SetTimeLabel(None if remaining is None else elapsed + remaining, self._estimated)
+            self.SetTimeLabel(remaining, self._remaining)
+            if self._rate:
+                rate = self.Stats[0].rate
+                strs = "unknown" if rate is None else "%.4g /s" % rate
+                if strs != self._rate.GetLabel():
+                    self._rate.SetLabel(strs)
 
         if self._state == Finished:
 
@@ -429,10 +519,13 @@ class PyProgress(wx.Dialog):
 
         if label:
 
-            hours = val / 3600
-            minutes = (val % 3600) / 60
-            seconds = val % 60
-            strs = ("%lu:%02lu:%02lu") % (hours, minutes, seconds)
+            if val is None:
+                strs = "unknown"
+            else:
+                hours = val / 3600
+                minutes = (val % 3600) / 60
+                seconds = val % 60
+                strs = ("%lu:%02lu:%02lu") % (hours, minutes, seconds)
 
             if strs != label.GetLabel():
                 label.SetLabel(strs)
@@ -457,3 +550,15 @@ class PyProgress(wx.Dialog):
         """ Disables the Cancel button. """
 
         self.EnableAbort(False)
+
+    def GetStats(self, bar=None):
+        """ RateStats.Summary() of one bar or a list for all of them. """
+
+        if bar is None:
+            return [stats.Summary() for stats in self.Stats]
+        return self.Stats[bar].Summary()
+
+    def WasCancelled(self):
+        """ Returns True if the user pressed Cancel or closed the dialog. """
+
+        return self._state == Canceled
@@ -0,0 +1,308 @@
+'''
+Settings.py
+
+Pluggable persistence for small GUI settings (window positions and the like) so callers don't depend on the
+Windows registry.  A backend stores values under key (a registry style path like "Progbar\\position") and name.
+
+GetSettings() returns the process wide backend unless SetSettings() installed another: RegistrySettings on
+Windows, so values saved by older versions are still found, and a JSONSettings file in the user's config
+directory elsewhere.
+The file backends read the file once and keep it in memory, the registry backend reads the registry every time as
+other code writes it directly.  In every backend set() only marks the value and flush() writes the changes, for
+the file backends merged into the file on disk so several processes can share it.
+
+load_all(key) and save_all(key, values) move every value under a key at once (GuiConfig uses them for whole
+dialogs), a single file read/write or one opened registry key rather than a round trip per value.
+The registry can only be read and written a key at a time when its root is known.  HSTB.shared.RegistryHelpers
+doesn't say where its keys live, so an application sets REGISTRY_ROOT (or passes GetSettings(root=...)) before
+the first GetSettings() call.  Without a root the registry backend on Windows gets no batching and makes a
+RegistryHelpers call per value.
+'''
+
+import abc
+import configparser
+import json
+import os
+import sys
+import threading
+
+# registry path the HSTB.shared.RegistryHelpers keys live under, e.g. "HKEY_CURRENT_USER\\Software\\Company",
+# used by GetSettings() for the default RegistrySettings.  Empty means unknown, values are then read one at a time.
+REGISTRY_ROOT = ''
+
+
+def DefaultSettingsPath(filename='settings.json'):
+    base = os.environ.get('APPDATA') or os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    return os.path.join(base, 'HSTB', filename)
+
+
+class SettingsBackend(abc.ABC):
+    '''Interface for the settings backends.'''
+
+    @abc.abstractmethod
+    def get(self, key, name, default=None):
+        pass
+
+    @abc.abstractmethod
+    def set(self, key, name, value):
+        pass
+
+    def flush(self):
+        '''Write out anything set() since the last flush.'''
+        pass
+
+    @abc.abstractmethod
+    def load_all(self, key, names=None):
+        '''{name: value} of everything stored under key.  names is only used by backends that can't list a key,
+        they read just those names.
+        '''
+
+    def save_all(self, key, values):
+        '''Store the {name: value} dict under key and flush.'''
+        for name, val in values.items():
+            self.set(key, name, val)
+        self.flush()
+
+
+class FileSettings(SettingsBackend):
+    '''Base for file backends, subclasses supply _read() returning {key: {name: value}} and _write(data).'''
+
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+        self._dirty = {}
+        self._lock = threading.Lock()
+
+    def _cached(self):
+        if self._data is None:
+            try:
+                self._data = self._read()
+            except (IOError, OSError, ValueError, configparser.Error):
+                self._data = {}
+        return self._data
+
+    def get(self, key, name, default=None):
+        with self._lock:
+            return self._cached().get(key, {}).get(name, default)
+
+    def set(self, key, name, value):
+        with self._lock:
+            self._cached().setdefault(key, {})[name] = value
+            self._dirty.setdefault(key, {})[name] = value
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                data = self._read()  # pick up what other processes wrote meanwhile
+            except (IOError, OSError, ValueError, configparser.Error):
+                data = {}
+            for key, values in self._dirty.items():
+                data.setdefault(key, {}).update(values)
+            folder = os.path.dirname(self.path)
+            if folder and not os.path.isdir(folder):
+                os.makedirs(folder)
+            tmp = self.path + '.%d.tmp' % os.getpid()
+            self._write(data, tmp)
+            os.replace(tmp, self.path)
+            self._data = data
+            self._dirty = {}
+
+    def load_all(self, key, names=None):
+        with self._lock:
+            return dict(self._cached().get(key, {}))
+
+    def save_all(self, key, values):
+        with self._lock:
+            self._cached().setdefault(key, {}).update(values)
+            self._dirty.setdefault(key, {}).update(values)
+        self.flush()
+
+
+class JSONSettings(FileSettings):
+    def __init__(self, path=None):
+        FileSettings.__init__(self, path or DefaultSettingsPath('settings.json'))
+
+    def _read(self):
+        with open(self.path) as f:
+            return json.load(f)
+
+    def _write(self, data, path):
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+
+
+class INISettings(FileSettings):
+    '''One section per key, values are JSON encoded so numbers come back as numbers.'''
+
+    def __init__(self, path=None):
+        FileSettings.__init__(self, path or DefaultSettingsPath('settings.ini'))
+
+    def _parser(self):
+        parser = configparser.RawConfigParser()
+        parser.optionxform = str  # keep the case of the names
+        return parser
+
+    def _read(self):
+        parser = self._parser()
+        if not parser.read(self.path):
+            return {}
+        data = {}
+        for section in parser.sections():
+            values = data[section] = {}
+            for name, v in parser.items(section):
+                try:
+                    values[name] = json.loads(v)
+                except ValueError:
+                    values[name] = v
+        return data
+
+    def _write(self, data, path):
+        parser = self._parser()
+        for key in sorted(data):
+            parser.add_section(key)
+            for name, v in sorted(data[key].items()):
+                parser.set(key, name, json.dumps(v))
+        with open(path, 'w') as f:
+            parser.write(f)
+
+
+class RegistrySettings(SettingsBackend):
+    '''The Windows registry through HSTB.shared.RegistryHelpers, ints as DWORDs and strings as paths
+    (the default value of a subkey named after the value).
+
+    root is the registry path the RegistryHelpers keys live under, e.g. "HKEY_CURRENT_USER\\Software\\Company",
+    by default the module's REGISTRY_ROOT.  With a root load_all/save_all open the key once with winreg and
+    enumerate it, without one they make a RegistryHelpers call per name.
+    Unlike the file backends nothing read is kept in memory: other code still writes these keys directly through
+    RegistryHelpers (window positions in GuiConfig and BaseAuiFrame), so get() and load_all() always read the
+    registry.  Only the values set() and not flushed yet are held, and they win over what is stored.
+    '''
+
+    def __init__(self, root=None):
+        from HSTB.shared import RegistryHelpers
+        self.reg = RegistryHelpers
+        self.root = root or REGISTRY_ROOT
+        self._dirty = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key, name):
+        val = self.reg.GetDWORDFromRegistry(key, name, None, bSilent=True)
+        if val is None:
+            val = self.reg.GetPathFromRegistry(key + '\\' + name, None, '')
+        return val
+
+    def get(self, key, name, default=None):
+        with self._lock:
+            pending = self._dirty.get(key, {})
+            val = pending[name] if name in pending else self._get(key, name)
+        return default if val is None else val
+
+    def set(self, key, name, value):
+        with self._lock:
+            self._dirty.setdefault(key, {})[name] = value
+
+    def flush(self):
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            for key, values in dirty.items():
+                if self.root:
+                    self._write(key, values)
+                else:
+                    for name, val in values.items():
+                        self._save(key, name, val)
+
+    def _save(self, key, name, value):
+        if isinstance(value, int):
+            self.reg.SaveDWORDToRegistry(key, name, value)
+        else:
+            try:
+                self.reg.SavePathToRegistry(key + '\\' + name, str(value), '')
+            except UnicodeEncodeError:
+                pass  # could be a label with a non-ascii character (like a degrees symbol)
+
+    def _open(self, key, create=False):
+        import winreg
+        hive, _, path = self.root.partition('\\')
+        path = '\\'.join(p for p in (path, key) if p)
+        if create:
+            return winreg.CreateKeyEx(getattr(winreg, hive), path, 0, winreg.KEY_ALL_ACCESS)
+        return winreg.OpenKey(getattr(winreg, hive), path)
+
+    def _read(self, key):
+        import winreg
+        values = {}
+        try:
+            hkey = self._open(key)
+        except OSError:
+            return values
+        with hkey:
+            nkeys, nvalues = winreg.QueryInfoKey(hkey)[:2]
+            for i in range(nvalues):
+                name, val, typ = winreg.EnumValue(hkey, i)
+                if typ == winreg.REG_DWORD:
+                    values[name] = val - (1 << 32) if val & 0x80000000 else val  # stored as unsigned
+            for i in range(nkeys):
+                name = winreg.EnumKey(hkey, i)
+                if name in values:
+                    continue  # a DWORD wins, like get()
+                try:
+                    with winreg.OpenKey(hkey, name) as sub:
+                        values[name] = winreg.QueryValueEx(sub, '')[0]
+                except OSError:
+                    pass  # a subkey without a default value, e.g. a nested group of settings
+        return values
+
+    def _write(self, key, values):
+        import winreg
+        with self._open(key, create=True) as hkey:
+            for name, val in values.items():
+                if isinstance(val, int):
+                    winreg.SetValueEx(hkey, name, 0, winreg.REG_DWORD, val & 0xFFFFFFFF)
+                else:
+                    winreg.SetValue(hkey, name, winreg.REG_SZ, str(val))
+
+    def load_all(self, key, names=None):
+        with self._lock:
+            if self.root:
+                values = self._read(key)
+            elif names is None:
+                raise ValueError('RegistrySettings can only list a key with a root, pass the names to read')
+            else:
+                values = {}
+                for name in names:
+                    val = self._get(key, name)
+                    if val is not None:
+                        values[name] = val
+            values.update(self._dirty.get(key, {}))  # not flushed yet
+            return values
+
+    def save_all(self, key, values):
+        with self._lock:
+            self._dirty.setdefault(key, {}).update(values)
+        self.flush()
+
+
+_settings = None
+_settings_lock = threading.Lock()
+
+
+def GetSettings(root=None):
+    '''The process wide backend.  root is the registry root for the default backend on Windows (REGISTRY_ROOT if
+    not given), it fills in the root of a RegistrySettings that was made without one.
+    '''
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = RegistrySettings(root) if sys.platform == 'win32' else JSONSettings()
+        elif root and isinstance(_settings, RegistrySettings) and not _settings.root:
+            _settings.root = root
+        return _settings
+
+
+def SetSettings(backend):
+    '''Install the process wide backend, e.g. SetSettings(RegistrySettings()).'''
+    global _settings
+    with _settings_lock:
+        _settings = backend
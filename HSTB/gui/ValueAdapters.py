@@ -0,0 +1,48 @@
+'''
+ValueAdapters.py
+
+Type dispatch for the GuiConfig modules (wx and qt): each control class registers a getter(w) and setter(w, value)
+and a control uses the adapter of the first registered class in its MRO, so a subclass always beats its base
+like the old isinstance chains did.  The MRO walk happens once per concrete type and is cached.
+
+Custom controls register their own adapters, e.g.
+    GuiConfig.value_adapters.register(MyColourPicker, lambda w: w.GetColour(), lambda w, v: w.SetColour(v))
+'''
+
+
+class ValueAdapters:
+    '''Registry of (getter, setter) pairs by control class, default is used for unregistered classes.'''
+
+    def __init__(self, default_getter, default_setter):
+        self.default = (default_getter, default_setter)
+        self._registry = {}
+        self._cache = {}
+
+    def register(self, classes, getter=None, setter=None):
+        '''classes is a class or tuple of classes, a getter or setter left as None keeps the one inherited from a base.'''
+        if not isinstance(classes, tuple):
+            classes = (classes,)
+        for cls in classes:
+            self._registry[cls] = (getter, setter)
+        self._cache.clear()
+
+    def lookup(self, cls):
+        '''(getter, setter) for cls, resolved through its MRO.'''
+        try:
+            return self._cache[cls]
+        except KeyError:
+            getter = setter = None
+            for base in cls.__mro__:
+                g, s = self._registry.get(base, (None, None))
+                getter = getter or g
+                setter = setter or s
+                if getter and setter:
+                    break
+            adapter = self._cache[cls] = (getter or self.default[0], setter or self.default[1])
+            return adapter
+
+    def get(self, w):
+        return self.lookup(type(w))[0](w)
+
+    def set(self, w, value):
+        return self.lookup(type(w))[1](w, value)
@@ -61,6 +61,8 @@ except:
 
 os.environ["PYDRO_GUI"] = "qt"
 from HSTB.shared import RegistryHelpers
+from HSTB.gui.ValueAdapters import ValueAdapters
+from HSTB.gui import Settings
 
 qt_ext = "(_\d+)?$"  # optional trailing underscore with number (qt designer auto-names this way)
 qt_automatic_window_names = {QtWidgets.QComboBox: re.compile("comboBox"+qt_ext),
@@ -191,19 +193,189 @@ class Manager(QtCore.QObject):
         self.cb()
         self.w.removeEventFilter(self)
 
+
+def _GetComboBox(w):
+    return w.currentText()
+
+
+def _SetComboBox(w, value):
+    if value is None:
+        value = ""
+    w.setCurrentText(value)
+
+
+def _GetListWidget(w):
+    return [i.text() for i in w.selectedItems()]
+
+
+def _SetListWidget(w, value):
+    w.clear()
+    w.addItems(value)
+
+
+def _SetLabel(w, value):
+    try:
+        if value is None:
+            value = ""
+        w.setText(value)
+    except:
+        w.setText(str(value))
+
+
+def _GetChecked(w):
+    return w.isChecked()
+
+
+def _SetChecked(w, value):
+    w.setChecked(value)
+
+
+def _GetCheckBox(w):
+    if w.isTristate():  # note: tri-mode checkboxes eval to True if wx.CHK_CHECKED or wx.CHK_UNDETERMINED
+        return w.checkState()  # wx.CHK_CHECKED,wx.CHK_UNCHECKED,wx.CHK_UNDETERMINED
+    else:
+        return w.isChecked()
+
+
+def _SetCheckBox(w, value):
+    if w.isTristate():  # note: for tri-mode checkboxes, Set3StateValue(False)==Set3StateValue(wx.CHK_UNCHECKED)
+        if isinstance(value, QtCore.Qt.CheckState):
+            # (QtCore.Qt.Unchecked, QtCore.Qt.PartiallyChecked, QtCore.Qt.Checked):
+            v = value
+        else:
+            if value:
+                v = QtCore.Qt.Checked
+            else:
+                v = QtCore.Qt.Unchecked
+        w.setCheckState(v)
+    else:
+        if value is None:
+            value = False
+        w.setChecked(value)
+
+
+def _ToQDate(value):
+    try:
+        return QtCore.QDate(value)  # datetime objects
+    except:  # ISO date string
+        return QtCore.QDate.fromString(value, "yyyy-MM-dd")
+
+
+def _GetCalendar(w):
+    return w.selectedDate().toPython()
+
+
+def _SetCalendar(w, value):
+    if value is not None:
+        w.setSelectedDate(_ToQDate(value))
+
+
+def _GetDateEdit(w):
+    return w.date().toPython()
+
+
+def _SetDateEdit(w, value):
+    if value is not None:
+        w.setDate(_ToQDate(value))
+
+
+def _GetTimeEdit(w):
+    return w.time().toPython()
+
+
+def _SetTimeEdit(w, value):
+    if value is not None:
+        try:
+            dt = QtCore.QTime(value)  # datetime objects
+        except:  # ISO date string
+            dt = QtCore.QTime.fromString(value, "hh:mm:ss")
+        w.setTime(dt)
+
+
+def _GetDateTimeEdit(w):
+    return w.dateTime().toPython()
+
+
+def _SetDateTimeEdit(w, value):
+    if value is not None:
+        try:
+            dt = QtCore.QDateTime(value)  # datetime objects
+        except:  # ISO date string
+            dt = QtCore.QDateTime.fromString(value, "yyyy-MM-dd hh:mm:ss")
+        w.setDateTime(dt)
+
+
+def _SetLineEdit(w, value):
+    w.setText(value)
+
+
+def _GetPlainText(w):
+    return w.toPlainText()
+
+
+def _SetPlainText(w, value):
+    w.setPlainText(value)
+
+
+def _GetNumber(w):
+    return w.value()
+
+
+def _SetSpinBox(w, value):
+    w.setValue(float(value))
+
+
+def _SetNumber(w, value):
+    w.setValue(value)
+
+
+def _GetText(w):
+    # we don't want w (ctrl) in general!; quasi-persistent GuiConfig ctrls are the exception rather than the rule (wx.Panel "hack" above); i.e., they become PyDeadObject
+    # print("unsupported type of Qt window '"+w.objectName()+"' "+str(type(w)))
+    return w.text()
+
+
+def _SetUnsupported(w, value):
+    # traceback.print_exc()
+    print("Error while trying to setitem in GuiConfig:")
+    print(w.objectName(), value)  # this shouldn't be too silent -- it's really a bug that needs to be found if it gets here.
+
+
+# getter/setter per widget class, extend with value_adapters.register(cls, getter, setter) for custom widgets
+value_adapters = ValueAdapters(_GetText, _SetUnsupported)
+value_adapters.register(QtWidgets.QComboBox, _GetComboBox, _SetComboBox)
+value_adapters.register(QtWidgets.QListWidget, _GetListWidget, _SetListWidget)
+value_adapters.register(QtWidgets.QLabel, _GetText, _SetLabel)
+value_adapters.register(QtWidgets.QRadioButton, _GetChecked, _SetChecked)
+value_adapters.register(QtWidgets.QCheckBox, _GetCheckBox, _SetCheckBox)
+value_adapters.register(QtWidgets.QCalendarWidget, _GetCalendar, _SetCalendar)
+value_adapters.register(QtWidgets.QDateEdit, _GetDateEdit, _SetDateEdit)  # QDateEdit and QTimeEdit are QDateTimeEdits, the MRO picks them first
+value_adapters.register(QtWidgets.QTimeEdit, _GetTimeEdit, _SetTimeEdit)
+value_adapters.register(QtWidgets.QDateTimeEdit, _GetDateTimeEdit, _SetDateTimeEdit)
+value_adapters.register(QtWidgets.QLineEdit, _GetText, _SetLineEdit)
+value_adapters.register((QtWidgets.QPlainTextEdit, QtWidgets.QTextEdit), _GetPlainText, _SetPlainText)  # should QTextEdit use HTML?
+value_adapters.register((QtWidgets.QSpinBox, QtWidgets.QDoubleSpinBox), _GetNumber, _SetSpinBox)
+value_adapters.register((QtWidgets.QProgressBar, QtWidgets.QDial, QtWidgets.QSlider), _GetNumber, _SetNumber)
+
+
 # FIXME when using a pyside6-uic generated ui file, the instance names are the same as the window names which makes __getattr__ fail.
 #       Either need to change the ui file variable names or revise the naming scheme here.
 class GuiConfig:
     ''' If using the registry to save/load, it will autoload if the use_registry is supplied on __init__.
-    Otherwise call UseRegistry and LoadFromRegistry.
+    Otherwise call UseRegistry and LoadFromRegistry.  registry_root is passed on to UseRegistry.
     It will auto store if derived from a wx.frame but not wx.Dialog as the EVT_CLOSE doesn't seem to catch for dialogs.
     For a Dialog, call manually after an ShowModal() == ID_OK so that only saved when user is happy with the choices,
     discard when dialog is cancelled.
 
     Recurse defines if only children are searched or if all descendant windows (grandchildren etc) are considered.
     '''
+    # internal state is underscored so it can't hide a widget of the same name from __getattr__
+    _value_adapters = value_adapters  # shared by all GuiConfigs, register custom widget classes with the module's value_adapters
+    _settings = None  # backend for Load/SaveToRegistry, see UseSettings
+    _registry_root = None  # registry root passed to Settings.GetSettings, None uses Settings.REGISTRY_ROOT
+    _persisted = None  # {name: value} as last loaded from/saved to the settings, SaveToRegistry only writes changes
 
-    def __init__(self, root, items=None, use_registry='', recurse=True):
+    def __init__(self, root, items=None, use_registry='', recurse=True, registry_root=None):
         self.root = root  # @todo there is a recursion problem occuring if root==self on the destruction of the root/self.
         if root is self:
             self.root = None
@@ -211,7 +383,7 @@ class GuiConfig:
         self.windows = win_dict(self.GetRoot(), recurse)  # self.__dict__['root'])
         if items:
             self.SetGUI(items)
-        self.UseRegistry(use_registry)
+        self.UseRegistry(use_registry, registry_root)
         self.LoadFromRegistry()
         self.RestorePosition()
         # self.q_catch_close = Manager(self.GetRoot(), self.accept)
@@ -245,17 +417,33 @@ class GuiConfig:
                     print(traceback.print_exc())
                     raise KeyError
 
-    def UseRegistry(self, key=''):
+    def UseRegistry(self, key='', root=None):
+        '''root is the registry path the keys live under (see Settings.REGISTRY_ROOT), it lets the registry be
+        read and written a key at a time instead of a value at a time.
+        '''
         self.reg_key = key
+        if root:
+            self.__dict__['_registry_root'] = root
+        self.__dict__['_persisted'] = None  # a different key, nothing known about what it holds
+
+    def UseSettings(self, backend):
+        '''Persist the control values with a Settings backend (e.g. Settings.JSONSettings()) instead of the registry.'''
+        self.__dict__['_settings'] = backend
+        self.__dict__['_persisted'] = None
+
+    def GetSettings(self):
+        if self._settings is None:
+            self.__dict__['_settings'] = Settings.GetSettings(self._registry_root)  # the registry on Windows, like before
+        return self._settings
 
     def LoadFromRegistry(self):
         if self.reg_key:
-            for name in self.keys():
-                val = RegistryHelpers.GetDWORDFromRegistry(self.reg_key, name, None, bSilent=True)
-                if val is None:
-                    val = RegistryHelpers.GetPathFromRegistry(self.reg_key + '\\' + name, None, '')
-                if val is not None:
-                    self.__setitem__(name, val)
+            names = list(self.keys())
+            values = self.GetSettings().load_all(self.reg_key, names)  # one read of the whole key
+            for name in names:
+                if name in values:
+                    self.__setitem__(name, values[name])
+            self.__dict__['_persisted'] = values
 
     def __setstate__(self, o):
         self.SetGUI(o)
@@ -269,28 +457,33 @@ class GuiConfig:
     def SaveToRegistry(self):
         '''
         Doesn't save things with default names as these could accidentally overwrite static items that are set by the constructor.
+        Only values that differ from what was last loaded or saved (self._persisted) are written.
         '''
         if self.reg_key:
                 # store everything that has a (potentially) unique name; avoid things with default name like wxSpinCtrl or staticText.
             self.SavePosition()
+            values = {}
             for name, w in self.named_windows():
                 try:
                     if isinstance(w, QtWidgets.QLabel):
                         continue  # don't save the value of static text
                     val = self.GetWindowValue(w)  # self.__getitem__(name) #using getitem is causing an n^2 problem as we are essentially calling iterwindows again for each window found.
                     if isinstance(val, int):
-                        RegistryHelpers.SaveDWORDToRegistry(self.reg_key, name, val)
+                        values[name] = val
                     elif isinstance(val, (float)):
-                        RegistryHelpers.SavePathToRegistry(self.reg_key + '\\' + name, str(val), '')
+                        values[name] = str(val)
                     elif isinstance(val, (str)):
-                        try:
-                            RegistryHelpers.SavePathToRegistry(self.reg_key + '\\' + name, str(val), '')
-                        except UnicodeEncodeError:
-                            pass  # could be a label with a non-ascii character (like a degrees symbol)
+                        values[name] = val
                     else:
                         print('unknown window value type:', name, val, type(val))
                 except AttributeError:
                     print('Attribute Error', name)
+            persisted = self._persisted if self._persisted is not None else {}
+            changed = dict((k, v) for k, v in values.items() if k not in persisted or persisted[k] != v)
+            if changed:
+                self.GetSettings().save_all(self.reg_key, changed)  # one write of the modified values
+            persisted.update(changed)
+            self.__dict__['_persisted'] = persisted
 
     def SavePosition(self):
         '''Old frame size/position save to registry, only used if the perspective save fails
@@ -432,51 +625,7 @@ class GuiConfig:
         return self.GetWindowValue(w)
 
     def GetWindowValue(self, w):
-        if isinstance(w, QtWidgets.QComboBox):  # This is a subclass of wx.Choice -- so check ComboBox and use GetValue first
-            return w.currentText()
-        elif isinstance(w, QtWidgets.QListWidget):
-            return [i.text() for i in w.selectedItems()]
-        elif isinstance(w, QtWidgets.QLabel):
-            return w.text()
-        elif isinstance(w, QtWidgets.QRadioButton):
-            return w.isChecked()
-        elif isinstance(w, QtWidgets.QCheckBox):
-            if w.isTristate():  # note: tri-mode checkboxes eval to True if wx.CHK_CHECKED or wx.CHK_UNDETERMINED
-                return w.checkState()  # wx.CHK_CHECKED,wx.CHK_UNCHECKED,wx.CHK_UNDETERMINED
-            else:
-                return w.isChecked()
-        elif isinstance(w, QtWidgets.QCalendarWidget):
-            return w.selectedDate().toPython()
-        elif isinstance(w, QtWidgets.QDateEdit):
-            return w.date().toPython()
-        elif isinstance(w, QtWidgets.QTimeEdit):
-            return w.time().toPython()
-        elif isinstance(w, QtWidgets.QDateTimeEdit):
-            return w.dateTime().toPython()
-        elif isinstance(w, QtWidgets.QLineEdit):
-            return w.text()
-        elif isinstance(w, QtWidgets.QPlainTextEdit):
-            return w.toPlainText()
-        elif isinstance(w, QtWidgets.QTextEdit):  # should this use HTML?
-            return w.toPlainText()
-        elif isinstance(w, (QtWidgets.QSpinBox, QtWidgets.QDoubleSpinBox)):
-            return w.value()
-        elif isinstance(w, QtWidgets.QProgressBar):
-            return w.value()
-        elif isinstance(w, (QtWidgets.QDial, QtWidgets.QSlider)):
-            return w.value()
-
-        # we don't want w (ctrl) in general!; quasi-persistent GuiConfig ctrls are the exception rather than the rule (wx.Panel "hack" above); i.e., they become PyDeadObject
-        # try:
-        # print("unsupported type of Qt window '"+w.objectName()+"' "+str(type(w)))
-        return w.text()
-        # except AttributeError:
-        #  if isinstance(w, wx.Panel): #The HSTP_DirBrowseButton control and the underlying wx control will return a GetValue in the "try" block.  This is for wx.Panel's that don't return a value
-        #      print "returning the wx.Panel instance from gui config"
-        #      raise Exception("tst")
-        #      return w #we shouldn't be doing this, if the window instance is needed it should be gotten by the .windows.WinName syntax
-        #  else:
-        #      pass # e.g., for N/A button ctrls
+        return self._value_adapters.get(w)
 
     def __getattr__(self, key):
         # Using the __getattr__ method is a little dangerous, if we're setting
@@ -502,80 +651,9 @@ class GuiConfig:
             raise KeyError("GuiConfig instance has no key '%s'" % str(key))
         self.SetWindowValue(w, value)
 
-    @staticmethod
-    def SetWindowValue(w, value):
-        if isinstance(w, QtWidgets.QComboBox):  # This is a subclass of wx.Choice -- so check ComboBox and use GetValue first
-            if value is None:
-                value = ""
-            w.setCurrentText(value)
-        elif isinstance(w, QtWidgets.QListWidget):
-            w.clear()
-            w.addItems(value)
-        elif isinstance(w, QtWidgets.QLabel):
-            try:
-                if value is None:
-                    value = ""
-                w.setText(value)
-            except:
-                w.setText(str(value))
-        elif isinstance(w, QtWidgets.QRadioButton):
-            w.setChecked(value)
-        elif isinstance(w, QtWidgets.QCheckBox):
-            if w.isTristate():  # note: for tri-mode checkboxes, Set3StateValue(False)==Set3StateValue(wx.CHK_UNCHECKED)
-                if isinstance(value, QtCore.Qt.CheckState):
-                    # (QtCore.Qt.Unchecked, QtCore.Qt.PartiallyChecked, QtCore.Qt.Checked):
-                    v = value
-                else:
-                    if value:
-                        v = QtCore.Qt.Checked
-                    else:
-                        v = QtCore.Qt.Unchecked
-                w.setCheckState(v)
-            else:
-                if value is None:
-                    value = False
-                w.setChecked(value)
-        elif isinstance(w, (QtWidgets.QCalendarWidget, QtWidgets.QDateEdit)):
-            if value is not None:
-                try:
-                    dt = QtCore.QDate(value)  # datetime objects
-                except:  # ISO date string
-                    dt = QtCore.QDate.fromString(value, "yyyy-MM-dd")
-                if isinstance(w, QtWidgets.QCalendarWidget):
-                    w.setSelectedDate(dt)
-                else:
-                    w.setDate(dt)
-        elif isinstance(w, QtWidgets.QTimeEdit):
-            if value is not None:
-                try:
-                    dt = QtCore.QTime(value)  # datetime objects
-                except:  # ISO date string
-                    dt = QtCore.QTime.fromString(value, "hh:mm:ss")
-                w.setTime(dt)
-        elif isinstance(w, QtWidgets.QDateTimeEdit):
-            if value is not None:
-                try:
-                    dt = QtCore.QDateTime(value)  # datetime objects
-                except:  # ISO date string
-                    dt = QtCore.QDateTime.fromString(value, "yyyy-MM-dd hh:mm:ss")
-                w.setDateTime(dt)
-        elif isinstance(w, QtWidgets.QLineEdit):
-            w.setText(value)
-        elif isinstance(w, (QtWidgets.QSpinBox, QtWidgets.QDoubleSpinBox)):
-            w.setValue(float(value))
-        elif isinstance(w, QtWidgets.QProgressBar):
-            w.setValue(value)
-        elif isinstance(w, (QtWidgets.QDial, QtWidgets.QSlider)):
-            w.setValue(value)
-        elif isinstance(w, QtWidgets.QPlainTextEdit):
-            return w.setPlainText(value)
-        elif isinstance(w, QtWidgets.QTextEdit):  # should this use HTML?
-            return w.setPlainText(value)
-
-        else:
-            # traceback.print_exc()
-            print("Error while trying to setitem in GuiConfig:")
-            print(w.objectName(), value)  # this shouldn't be too silent -- it's really a bug that needs to be found if it gets here.
+    @classmethod
+    def SetWindowValue(cls, w, value):
+        cls._value_adapters.set(w, value)
 
     def __setattr__(self, key, value):
         try:
@@ -19,6 +19,12 @@ Original comment follows below:
 #
 """
 
+import collections
+import multiprocessing
+import os
+import sys
+import time
+
 import wx
 import string
 
@@ -43,9 +49,27 @@ information on downloading source or binaries.""",
 #
 class PolyPoints:
 
+    # number of points kept on either side of the visible x interval so that
+    # segments crossing the edge of the plot box are still drawn
+    _cull_margin = 0
+    # True if the points may be reordered on x without changing the picture (markers), a line keeps its order
+    _sortable = True
+
     def __init__(self, points, attr):
-        self.points = numpy.array(points)
+        self.points = numpy.array(points, dtype=float)
+        self.monotonic = True  # x non-decreasing, so the visible range can be found by bisection
+        if len(self.points) > 1:
+            x = self.points[:, 0]
+            if numpy.any(x[1:] < x[:-1]):
+                if self._sortable:
+                    self.points = self.points[numpy.argsort(x, kind='mergesort')]
+                elif numpy.all(x[1:] <= x[:-1]):
+                    self.points = self.points[::-1].copy()  # same line drawn the other way
+                else:
+                    self.monotonic = False  # ship tracks, contours etc. are drawn whole
         self.scaled = self.points
+        self.visible = slice(0, len(self.points))
+        self._xkey = None
         self.attributes = {}
         for name, value in list(self._attributes.items()):
             try:
@@ -57,12 +81,39 @@ class PolyPoints:
         return numpy.minimum.reduce(self.points), \
                numpy.maximum.reduce(self.points)
 
+    def XKey(self):
+        """Identifies the x samples, series with equal keys can share a VisibleIndexCache entry."""
+        if self._xkey is None:
+            self._xkey = (len(self.points), hash(numpy.ascontiguousarray(self.points[:, 0]).tobytes()))
+        return self._xkey
+
+    def cull(self, lower, upper, ylower=None, yupper=None, index=None):
+        """Restrict drawing to the points with lower <= x <= upper.
+        The points are stored sorted on x so this is a pair of binary searches,
+        or a lookup in index (a VisibleIndexCache) when one is supplied.
+        Series that aren't monotonic in x are not culled.
+        The y interval is only passed along for plot types that bin the visible points.
+        """
+        if not self.monotonic:
+            self.visible = slice(0, len(self.points))
+            return
+        if index is not None:
+            start, stop = index.Range(self, lower, upper)
+        else:
+            x = self.points[:, 0]
+            start = int(numpy.searchsorted(x, lower, 'left'))
+            stop = int(numpy.searchsorted(x, upper, 'right'))
+        self.visible = slice(max(start - self._cull_margin, 0), min(stop + self._cull_margin, len(self.points)))
+
     def scaleAndShift(self, scale=1, shift=0):
-        self.scaled = scale*self.points+shift
+        self.scaled = scale*self.points[self.visible]+shift
 
 
 class PolyLine(PolyPoints):
 
+    _cull_margin = 1
+    _sortable = False
+
     def __init__(self, points, **attr):
         PolyPoints.__init__(self, points, attr)
 
@@ -73,8 +124,10 @@ class PolyLine(PolyPoints):
         color = self.attributes['color']
         width = self.attributes['width']
         arguments = []
+        if len(self.scaled) < 2:
+            return
         dc.SetPen(wx.Pen(wx.NamedColour(color), width))
-        dc.DrawLines(list(map(tuple,self.scaled)))
+        dc.DrawLines(self.scaled)
 
 
 class PolyMarker(PolyPoints):
@@ -99,13 +152,16 @@ class PolyMarker(PolyPoints):
         fillstyle = self.attributes['fillstyle']
         marker = self.attributes['marker']
 
-	dc.SetPen(wx.Pen(wx.NamedColour(color),width))
-	if fillcolor:
-	    dc.SetBrush(wx.Brush(wx.NamedColour(fillcolor),fillstyle))
-	else:
-	    dc.SetBrush(wx.Brush(wx.NamedColour('black'), wx.TRANSPARENT))
+        dc.SetPen(wx.Pen(wx.NamedColour(color),width))
+        if fillcolor:
+            dc.SetBrush(wx.Brush(wx.NamedColour(fillcolor),fillstyle))
+        else:
+            dc.SetBrush(wx.Brush(wx.NamedColour('black'), wx.TRANSPARENT))
 
-	self._drawmarkers(dc, self.scaled, marker, size)
+        # with a GraphicsContext all the markers go into one path that is drawn in a single call
+        path = dc.BeginPath()
+        self._drawmarkers(path, self.scaled, marker, size)
+        dc.EndPath(path)
 
     def _drawmarkers(self, dc, coords, marker,size=1):
         f = eval('self._' +marker)
@@ -139,6 +195,117 @@ class PolyMarker(PolyPoints):
         dc.DrawLine(xc-2.5*size,yc,xc+2.5*size,yc)
         dc.DrawLine(xc,yc-2.5*size,xc,yc+2.5*size)
 
+# anchor colours (r, g, b) for the colour maps, spread evenly from low to high counts
+colormaps = {'gray': [(230, 230, 230), (0, 0, 0)],
+             'heat': [(0, 0, 128), (0, 128, 255), (0, 255, 128), (255, 255, 0), (255, 64, 0), (128, 0, 0)],
+             'viridis': [(68, 1, 84), (59, 82, 139), (33, 145, 140), (94, 201, 98), (253, 231, 37)],
+             }
+
+
+def MakeColormap(colors, n=256):
+    """Interpolate a list of (r, g, b) anchors (or the name of one in colormaps) into an (n, 3) uint8 lookup table."""
+    if isinstance(colors, str):
+        colors = colormaps[colors]
+    colors = numpy.asarray(colors, dtype=float)
+    at = numpy.linspace(0., 1., len(colors))
+    v = numpy.linspace(0., 1., n)
+    return numpy.column_stack([numpy.interp(v, at, colors[:, c]) for c in range(3)]).round().astype(numpy.uint8)
+
+
+class PolyDensity(PolyPoints):
+    """Draws a large point cloud as a 2D histogram at the current pixel resolution, as a single bitmap
+    rather than a marker per point.  The image is cached for the axis range and size it was binned for,
+    so repaints and pans of the window that don't change the range cost nothing.
+    """
+
+    # points binned per pass, bounds the temporary memory for very large clouds
+    _chunk = 2000000
+
+    def __init__(self, points, **attr):
+        PolyPoints.__init__(self, points, attr)
+        self._bbox = None
+        self._box = None
+        self._cache_key = None
+        self._cache_bmp = None
+        self._lut = None
+
+    _attributes = {'colormap': 'heat',
+                   'log': True,  # colour by log(count) so sparse areas still show
+                   'binsize': 1,  # pixels per bin
+                   'alpha': 255}
+
+    def boundingBox(self):
+        if self._bbox is None:
+            self._bbox = PolyPoints.boundingBox(self)
+        return self._bbox[0].copy(), self._bbox[1].copy()
+
+    def cull(self, lower, upper, ylower=None, yupper=None, index=None):
+        PolyPoints.cull(self, lower, upper, index=index)
+        self._box = (lower, upper, ylower, yupper)
+
+    def scaleAndShift(self, scale=1, shift=0):
+        # the points are binned straight from data coordinates in draw, no need to transform them all
+        self._scale, self._shift = scale, shift
+
+    def _pixelBox(self):
+        lower, upper, ylower, yupper = self._box
+        c1 = numpy.array([lower, yupper]) * self._scale + self._shift
+        c2 = numpy.array([upper, ylower]) * self._scale + self._shift
+        return c1, c2
+
+    def histogram(self, nx, ny):
+        """Counts of the visible points on an ny by nx grid over the current box, row 0 at the top."""
+        lower, upper, ylower, yupper = self._box
+        counts = numpy.zeros(nx * ny, dtype=numpy.int64)
+        fx = nx / float(upper - lower)
+        fy = ny / float(yupper - ylower)
+        start, stop = self.visible.start, self.visible.stop
+        for i in range(start, stop, self._chunk):
+            pts = self.points[i:min(i + self._chunk, stop)]
+            y = pts[:, 1]
+            inside = (y >= ylower) & (y <= yupper)
+            ix = numpy.minimum(((pts[inside, 0] - lower) * fx).astype(numpy.int64), nx - 1)
+            iy = numpy.minimum(((yupper - y[inside]) * fy).astype(numpy.int64), ny - 1)
+            counts += numpy.bincount(iy * nx + numpy.maximum(ix, 0), minlength=nx * ny)
+        return counts.reshape(ny, nx)
+
+    def _makeBitmap(self, width, height):
+        binsize = max(int(self.attributes['binsize']), 1)
+        nx, ny = max(width // binsize, 1), max(height // binsize, 1)
+        counts = self.histogram(nx, ny)
+        top = counts.max()
+        if self._lut is None:
+            self._lut = MakeColormap(self.attributes['colormap'])
+        if top > 0:
+            if self.attributes['log']:
+                v = numpy.log1p(counts) / numpy.log1p(top)
+            else:
+                v = counts / float(top)
+        else:
+            v = numpy.zeros(counts.shape)
+        rgb = self._lut[(v * (len(self._lut) - 1)).astype(numpy.intp)]
+        alpha = numpy.where(counts > 0, self.attributes['alpha'], 0).astype(numpy.uint8)
+        img = wx.Image(nx, ny, numpy.ascontiguousarray(rgb).tobytes(), alpha.tobytes())
+        if binsize > 1:
+            img.Rescale(width, height, wx.IMAGE_QUALITY_NORMAL)
+        return img.ConvertToBitmap()
+
+    def draw(self, dc):
+        if self._box is None or len(self.points) == 0:
+            return
+        c1, c2 = self._pixelBox()
+        x0, y0 = numpy.minimum(c1, c2)
+        width = int(round(abs(c2[0] - c1[0])))
+        height = int(round(abs(c2[1] - c1[1])))
+        if width <= 0 or height <= 0:
+            return
+        key = self._box + (width, height)
+        if key != self._cache_key:
+            self._cache_bmp = self._makeBitmap(width, height)
+            self._cache_key = key
+        dc.DrawBitmap(self._cache_bmp, x0, y0)
+
+
 class PlotGraphics:
 
     def __init__(self, objects):
@@ -152,6 +319,10 @@ class PlotGraphics:
             p2 = numpy.maximum(p2, p2o)
         return p1, p2
 
+    def cull(self, lower, upper, ylower=None, yupper=None, index=None):
+        for o in self.objects:
+            o.cull(lower, upper, ylower, yupper, index)
+
     def scaleAndShift(self, scale=1, shift=0):
         for o in self.objects:
             o.scaleAndShift(scale, shift)
@@ -167,92 +338,648 @@ class PlotGraphics:
         return self.objects[item]
 
 
-class PlotCanvas(wx.Panel):
+#
+# Rendering backends...
+#
+class DCRenderer:
+    """Draws through the plain wx.DC API, also the fallback when a GraphicsContext can't be made for the dc.
+    Plot objects and the axes draw through a renderer; anything not wrapped here
+    (GetTextExtent, GetFont, GetCharHeight...) is passed through to the dc.
+    """
+    name = 'dc'
 
-    def __init__(self, parent, id = -1):
-        wx.Panel.__init__(self, parent, id, wx.DefaultPosition, wx.DefaultSize)
-        self.border = (1,1)
-        self.SetClientSizeWH(400,400)
-        self.SetBackgroundColour(wx.NamedColour("white"))
+    def __init__(self, dc):
+        self.dc = dc
 
-        wx.EVT_SIZE(self,self.reconfigure)
-        wx.EVT_PAINT(self, self.OnPaint)
-        self._setsize()
-        self.last_draw = None
-#	self.font = self._testFont(font)
+    def __getattr__(self, key):
+        return getattr(self.__dict__['dc'], key)
 
-    def OnPaint(self, event):
-        pdc = wx.PaintDC(self)
-        if self.last_draw is not None:
-            self.draw(*self.last_draw + (pdc,))
+    def SetPen(self, pen):
+        self.dc.SetPen(pen)
 
-    def reconfigure(self, event):
-        (new_width,new_height) = self.GetClientSizeTuple()
-        if new_width == self.width and new_height == self.height:
+    def SetBrush(self, brush):
+        self.dc.SetBrush(brush)
+
+    def DrawLine(self, x1, y1, x2, y2):
+        self.dc.DrawLine(int(round(x1)), int(round(y1)), int(round(x2)), int(round(y2)))
+
+    def DrawLines(self, points):
+        self.dc.DrawLines(numpy.rint(points).astype(int).tolist())
+
+    def DrawText(self, text, x, y):
+        self.dc.DrawText(text, int(round(x)), int(round(y)))
+
+    def DrawBitmap(self, bmp, x, y):
+        self.dc.DrawBitmap(bmp, int(round(x)), int(round(y)))
+
+    def SetClippingRegion(self, x, y, w, h):
+        self.dc.SetClippingRegion(x, y, w, h)
+
+    def DestroyClippingRegion(self):
+        self.dc.DestroyClippingRegion()
+
+    def BeginPath(self):
+        """Returns an object with the dc drawing methods that markers are drawn onto; EndPath puts it on screen."""
+        return _IntDC(self.dc)
+
+    def EndPath(self, path):
+        pass
+
+
+class _IntDC:
+    """Rounds the float coordinates the marker functions produce, which the Phoenix dc methods won't accept."""
+
+    def __init__(self, dc):
+        self.dc = dc
+
+    def DrawEllipse(self, x, y, w, h):
+        self.dc.DrawEllipse(int(round(x)), int(round(y)), int(round(w)), int(round(h)))
+
+    def DrawRectangle(self, x, y, w, h):
+        self.dc.DrawRectangle(int(round(x)), int(round(y)), int(round(w)), int(round(h)))
+
+    def DrawPoint(self, x, y):
+        self.dc.DrawPoint(int(round(x)), int(round(y)))
+
+    def DrawLine(self, x1, y1, x2, y2):
+        self.dc.DrawLine(int(round(x1)), int(round(y1)), int(round(x2)), int(round(y2)))
+
+    def DrawPolygon(self, points, xoffset=0, yoffset=0):
+        self.dc.DrawPolygon([(int(round(x)), int(round(y))) for x, y in points], int(round(xoffset)), int(round(yoffset)))
+
+
+class _PathDC:
+    """Collects dc style drawing calls into one wx.GraphicsPath.
+    Only meant for shapes with a few points (markers), line series go through GCRenderer.DrawLines.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def DrawEllipse(self, x, y, w, h):
+        self.path.AddEllipse(x, y, w, h)
+
+    def DrawRectangle(self, x, y, w, h):
+        self.path.AddRectangle(x, y, w, h)
+
+    def DrawPoint(self, x, y):
+        self.path.AddRectangle(x, y, 1, 1)
+
+    def DrawLine(self, x1, y1, x2, y2):
+        self.path.MoveToPoint(x1, y1)
+        self.path.AddLineToPoint(x2, y2)
+
+    def DrawLines(self, points):
+        points = numpy.asarray(points, dtype=float).tolist()
+        path = self.path
+        path.MoveToPoint(*points[0])
+        for x, y in points[1:]:
+            path.AddLineToPoint(x, y)
+
+    def DrawPolygon(self, points, xoffset=0, yoffset=0):
+        self.DrawLines([(x + xoffset, y + yoffset) for x, y in points])
+        self.path.CloseSubpath()
+
+
+class GCRenderer(DCRenderer):
+    """Antialiased drawing through wx.GraphicsContext.  Each series is built into a single
+    GraphicsPath and stroked (or filled) with one call.
+    """
+    name = 'gc'
+
+    def __init__(self, dc):
+        DCRenderer.__init__(self, dc)
+        try:
+            self.gc = wx.GraphicsContext.Create(dc)
+        except (NotImplementedError, TypeError):
+            self.gc = None
+        if not self.gc:
+            raise NotImplementedError("no GraphicsContext for %s" % type(dc).__name__)
+        self.gc.SetAntialiasMode(wx.ANTIALIAS_DEFAULT)
+
+    def SetPen(self, pen):
+        self.dc.SetPen(pen)  # keep the dc in step so pass-through calls see the same state
+        self.gc.SetPen(pen)
+
+    def SetBrush(self, brush):
+        self.dc.SetBrush(brush)
+        self.gc.SetBrush(brush)
+
+    def DrawLine(self, x1, y1, x2, y2):
+        self.gc.StrokeLine(x1, y1, x2, y2)
+
+    def DrawLines(self, points):
+        if len(points) < 2:
             return
-        self._setsize()
-        self.redraw()
+        # StrokeLines builds and strokes the path in C++, a per point AddLineToPoint loop costs more than the drawing
+        self.gc.StrokeLines(numpy.asarray(points, dtype=float).tolist())
 
-    def _testFont(self, font):
-        if font is not None:
-            bg = self.canvas.cget('background')
+    def DrawText(self, text, x, y):
+        self.gc.SetFont(self.dc.GetFont(), self.dc.GetTextForeground())
+        self.gc.DrawText(text, x, y)
+
+    def DrawBitmap(self, bmp, x, y):
+        self.gc.DrawBitmap(bmp, x, y, bmp.GetWidth(), bmp.GetHeight())
+
+    def SetClippingRegion(self, x, y, w, h):
+        self.gc.Clip(x, y, w, h)
+
+    def DestroyClippingRegion(self):
+        self.gc.ResetClip()
+
+    def BeginPath(self):
+        return _PathDC(self.gc.CreatePath())
+
+    def EndPath(self, path):
+        self.gc.DrawPath(path.path)
+
+
+class _PDFFont:
+    """Stands in for wx.Font so TextExtentCache can key the pdf extents."""
+
+    def __init__(self, name, size):
+        self.name, self.size = name, size
+
+    def IsOk(self):
+        return True
+
+    def GetNativeFontInfoDesc(self):
+        return "pdf %s %s" % (self.name, self.size)
+
+
+class _PDFPath:
+    """Collects dc style drawing calls into one reportlab path."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def DrawEllipse(self, x, y, w, h):
+        self.path.ellipse(x, y, w, h)
+
+    def DrawRectangle(self, x, y, w, h):
+        self.path.rect(x, y, w, h)
+
+    def DrawPoint(self, x, y):
+        self.path.rect(x, y, 1, 1)
+
+    def DrawLine(self, x1, y1, x2, y2):
+        self.path.moveTo(x1, y1)
+        self.path.lineTo(x2, y2)
+
+    def DrawLines(self, points):
+        points = numpy.asarray(points, dtype=float).tolist()
+        path = self.path
+        path.moveTo(*points[0])
+        for x, y in points[1:]:
+            path.lineTo(x, y)
+
+    def DrawPolygon(self, points, xoffset=0, yoffset=0):
+        self.DrawLines([(x + xoffset, y + yoffset) for x, y in points])
+        self.path.close()
+
+
+class PDFRenderer(DCRenderer):
+    """Vector pdf output onto a reportlab canvas, used by SavePlot for .pdf files.
+    There is no dc behind it, text is measured with the reportlab font metrics.
+    """
+    name = 'pdf'
+
+    def __init__(self, canv, height, fontname='Helvetica', fontsize=9):
+        self.dc = None
+        self.canv = canv
+        self.fontname = fontname
+        self.fontsize = fontsize
+        self._stroke = self._fill = 0
+        # reportlab's origin is the bottom left, flip it so the painter's pixel coordinates work as is
+        canv.translate(0, height)
+        canv.scale(1, -1)
+        canv.setLineJoin(1)
+
+    def GetFont(self):
+        return _PDFFont(self.fontname, self.fontsize)
+
+    def GetPPI(self):
+        return (72, 72)
+
+    def GetTextExtent(self, text):
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+        return stringWidth(text, self.fontname, self.fontsize), self.GetCharHeight()
+
+    def GetCharHeight(self):
+        return 1.2 * self.fontsize
+
+    def SetPen(self, pen):
+        self._stroke = 0 if pen.IsTransparent() else 1
+        c = pen.GetColour()
+        self.canv.setStrokeColorRGB(c.Red() / 255., c.Green() / 255., c.Blue() / 255.)
+        self.canv.setLineWidth(pen.GetWidth())
+
+    def SetBrush(self, brush):
+        self._fill = 0 if brush.IsTransparent() else 1
+        c = brush.GetColour()
+        self.canv.setFillColorRGB(c.Red() / 255., c.Green() / 255., c.Blue() / 255.)
+
+    def DrawLine(self, x1, y1, x2, y2):
+        path = self.BeginPath()
+        path.DrawLine(x1, y1, x2, y2)
+        self.canv.drawPath(path.path, stroke=self._stroke, fill=0)
+
+    def DrawLines(self, points):
+        if len(points) < 2:
+            return
+        path = self.BeginPath()
+        path.DrawLines(points)
+        self.canv.drawPath(path.path, stroke=self._stroke, fill=0)
+
+    def DrawText(self, text, x, y):
+        canv = self.canv
+        canv.saveState()
+        canv.setFillColorRGB(0, 0, 0)
+        canv.translate(x, y + self.fontsize)  # dc text is positioned by its top, pdf text by the baseline
+        canv.scale(1, -1)
+        canv.setFont(self.fontname, self.fontsize)
+        canv.drawString(0, 0, text)
+        canv.restoreState()
+
+    def DrawBitmap(self, bmp, x, y):
+        from PIL import Image
+        from reportlab.lib.utils import ImageReader
+        img = bmp.ConvertToImage()
+        w, h = img.GetWidth(), img.GetHeight()
+        pil = Image.frombytes('RGB', (w, h), bytes(img.GetData()))
+        if img.HasAlpha():
+            pil.putalpha(Image.frombytes('L', (w, h), bytes(img.GetAlpha())))
+        canv = self.canv
+        canv.saveState()
+        canv.translate(x, y + h)
+        canv.scale(1, -1)
+        canv.drawImage(ImageReader(pil), 0, 0, w, h, mask='auto')
+        canv.restoreState()
+
+    def SetClippingRegion(self, x, y, w, h):
+        self.canv.saveState()
+        path = self.canv.beginPath()
+        path.rect(x, y, w, h)
+        self.canv.clipPath(path, stroke=0, fill=0)
+
+    def DestroyClippingRegion(self):
+        self.canv.restoreState()
+
+    def BeginPath(self):
+        return _PDFPath(self.canv.beginPath())
+
+    def EndPath(self, path):
+        self.canv.drawPath(path.path, stroke=self._stroke, fill=self._fill)
+
+
+renderers = {'dc': DCRenderer, 'gc': GCRenderer}
+default_renderer = 'gc'
+
+
+class VisibleIndexCache:
+    """Remembers the visible index range found for each distinct set of x samples, so linked plots
+    of series recorded together (depth, heave, sound speed against one time base) bisect once.
+    """
+
+    def __init__(self):
+        self._interval = None
+        self._ranges = {}
+
+    def Range(self, series, lower, upper):
+        if (lower, upper) != self._interval:
+            self._interval = (lower, upper)
+            self._ranges = {}
+        key = series.XKey()
+        try:
+            return self._ranges[key]
+        except KeyError:
+            x = series.points[:, 0]
+            r = self._ranges[key] = (int(numpy.searchsorted(x, lower, 'left')), int(numpy.searchsorted(x, upper, 'right')))
+            return r
+
+
+class SharedXAxis:
+    """One x axis shared by several plots (see LinkedPlotPanel).  The interval, x ticks, label margins,
+    x transform and visible index ranges are worked out once and used by every plot, and a zoom or pan
+    in any of them redraws them all in a single coalesced pass.
+    """
+
+    def __init__(self):
+        self.panels = []
+        self.interval = None  # (lower, upper) from zoom/pan, None fits the data of all the plots
+        self.index = VisibleIndexCache()
+        self._fit = None
+        self._margins = [0., 0.]
+        self._needs = {}  # panel -> (left, right) label widths from its last layout
+        self._ticks = (None, None)
+        self._transform = (None, None)
+        self._pending = False
+
+    def Add(self, panel):
+        if panel not in self.panels:
+            self.panels.append(panel)
+        self.DataChanged()
+
+    def Remove(self, panel):
+        if panel in self.panels:
+            self.panels.remove(panel)
+        self._needs.pop(panel, None)
+        self.DataChanged()
+        self.Invalidate()  # the others may not need as wide a margin any more
+
+    def DataChanged(self, replaced=False):
+        """A plot was added, removed or got new graphics, refit the interval.
+        replaced means a plot's graphics were swapped for new ones, which also forgets the pan/zoom
+        like a single canvas does.
+        """
+        self._fit = None
+        if replaced:
+            self.interval = None
+
+    def GetInterval(self):
+        if self.interval is not None:
+            return self.interval
+        if self._fit is None:
+            lower = upper = spec = painter = None
+            for p in self.panels:
+                if p.last_draw is None:
+                    continue
+                graphics, xspec, yspec = p.last_draw
+                b1, b2 = graphics.boundingBox()
+                lower = b1[0] if lower is None else min(lower, b1[0])
+                upper = b2[0] if upper is None else max(upper, b2[0])
+                if spec is None:
+                    spec = xspec
+                painter = p
+            if painter is None:
+                return None  # no plot has any data yet
+            self._fit = painter._axisInterval(spec or 'minimal', lower, upper)
+        return self._fit
+
+    def SetInterval(self, interval):
+        self.interval = None if interval is None else tuple(sorted(interval))
+        self.Invalidate()
+
+    def Ticks(self, painter, lower, upper):
+        if self._ticks[0] != (lower, upper):
+            self._ticks = ((lower, upper), painter._ticks(lower, upper))
+        return self._ticks[1]
+
+    def Margins(self, panel, left, right):
+        """Record the label widths panel needs and return the shared margins, the widest need of the current
+        plots.  The others are redrawn if the margins grew or shrank.
+        """
+        self._needs[panel] = (left, right)
+        needs = [self._needs[p] for p in self.panels if p in self._needs]
+        margins = [max(n[0] for n in needs), max(n[1] for n in needs)] if needs else [left, right]
+        if margins != self._margins:
+            self._margins = margins
+            self.Invalidate()
+        return list(margins)
+
+    def XTransform(self, width, origin, lower, upper, left, right):
+        """Returns (scale, shift) for x, computed once for all the plots of the same width."""
+        key = (width, origin, lower, upper, left, right)
+        if self._transform[0] != key:
+            scale = (width-left-right) / (upper-lower)
+            self._transform = (key, (scale, -lower*scale + origin + left))
+        return self._transform[1]
+
+    def Invalidate(self):
+        """Redraw every plot once after the pending events, so a burst of wheel or drag events gives one redraw."""
+        if not self._pending:
+            self._pending = True
+            wx.CallAfter(self._Redraw)
+
+    def _Redraw(self):
+        self._pending = False
+        for p in self.panels:
+            if p:  # skip windows that have been destroyed
+                p.redraw()
+
+
+def MakeRenderer(dc, backend=None):
+    """Wrap dc in the requested renderer, falling back to plain dc drawing if the backend can't handle this kind of dc."""
+    try:
+        return renderers[backend or default_renderer](dc)
+    except NotImplementedError:
+        return DCRenderer(dc)
+
+
+class TextExtentCache:
+    """Small LRU of label extents keyed by font, so the axes don't query the dc for every label on every draw."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._cache = collections.OrderedDict()
+
+    @staticmethod
+    def FontKey(dc):
+        font = dc.GetFont()
+        desc = font.GetNativeFontInfoDesc() if font.IsOk() else ''
+        return desc, tuple(dc.GetPPI())
+
+    def GetTextExtents(self, dc, labels):
+        """Returns a list of (width, height) for labels drawn with the current font of dc."""
+        fontkey = self.FontKey(dc)
+        cache = self._cache
+        extents = []
+        for label in labels:
+            key = (fontkey, label)
             try:
-                item = CanvasText(self.canvas, 0, 0, anchor=NW,
-                                  text='0', fill=bg, font=font)
-                self.canvas.delete(item)
-            except TclError:
-                font = None
-        return font
+                bb = cache[key]
+                cache.move_to_end(key)
+            except KeyError:
+                bb = cache[key] = tuple(dc.GetTextExtent(label))
+                if len(cache) > self.maxsize:
+                    cache.popitem(last=False)
+            extents.append(bb)
+        return extents
+
+    def GetTextExtent(self, dc, label):
+        return self.GetTextExtents(dc, [label])[0]
 
-    def _setsize(self):
-        (self.width,self.height) = self.GetClientSizeTuple();
+    def clear(self):
+        self._cache.clear()
+
+
+# shared by all PlotCanvas instances
+text_extents = TextExtentCache()
+
+
+class PlotPainter:
+    """The window independent part of PlotCanvas.  Lays out the axes and draws a PlotGraphics
+    onto any dc (or renderer) of the given size, so plots can be made without a frame.
+    """
+
+    def __init__(self, width=640, height=480, backend=None):
+        self.backend = backend  # key into renderers, None for default_renderer
+        self.last_draw = None
+        self._view = None  # (xinterval, yinterval) set by pan/zoom, overrides the axis specs
+        self._limits = None  # data interval (p1, p2) of the last draw
+        self._scale = self._shift = None  # data->pixel transform of the last draw
+        self.xlink = None  # SharedXAxis when the x axis is linked with other plots
+        self.SetPlotSize(width, height)
+
+    def SetPlotSize(self, width, height):
+        self.width, self.height = width, height
         self.plotbox_size = 0.97*numpy.array([self.width, -self.height])
         xo = 0.5*(self.width-self.plotbox_size[0])
         yo = self.height-0.5*(self.height+self.plotbox_size[1])
         self.plotbox_origin = numpy.array([xo, yo])
 
-    def draw(self, graphics, xaxis = None, yaxis = None, dc = None):
-        if dc == None: dc = wx.ClientDC(self)
-        dc.BeginDrawing()
-        dc.Clear()
+    def GetDrawingDC(self):
+        """The dc used by draw/redraw when none is given, a painter has none."""
+        return None
+
+    def SetXLink(self, link):
+        """Share the x axis with the other plots on link (a SharedXAxis), None to unlink."""
+        if self.xlink is not None:
+            self.xlink.Remove(self)
+        self.xlink = link
+        if link is not None:
+            link.Add(self)
+
+    def SetGraphics(self, graphics, xaxis = None, yaxis = None):
+        """Record what draw/redraw will show without drawing it."""
+        if self.last_draw is None or graphics is not self.last_draw[0]:
+            replaced = self.last_draw is not None
+            if replaced:
+                self._view = None  # new data, forget the previous pan/zoom
+            if self.xlink is not None:
+                self.xlink.DataChanged(replaced)
         self.last_draw = (graphics, xaxis, yaxis)
+
+    def draw(self, graphics, xaxis = None, yaxis = None, dc = None):
+        if dc == None: dc = self.GetDrawingDC()
+        self.SetGraphics(graphics, xaxis, yaxis)
+        if dc is None:
+            return
+        if not isinstance(dc, DCRenderer):
+            dc.Clear()
+            dc = MakeRenderer(dc, self.backend)
         p1, p2 = graphics.boundingBox()
         xaxis = self._axisInterval(xaxis, p1[0], p2[0])
         yaxis = self._axisInterval(yaxis, p1[1], p2[1])
+        if self._view is not None:
+            (p1[0], p2[0]), (p1[1], p2[1]) = self._view
+            if xaxis is not None:
+                xaxis = self._view[0]
+            if yaxis is not None:
+                yaxis = self._view[1]
+        link = self.xlink
+        if link is not None and link.GetInterval() is not None:
+            p1[0], p2[0] = link.GetInterval()
+            if xaxis is not None:
+                xaxis = (p1[0], p2[0])
         text_width = [0., 0.]
         text_height = [0., 0.]
         if xaxis is not None:
             p1[0] = xaxis[0]
             p2[0] = xaxis[1]
-            xticks = self._ticks(xaxis[0], xaxis[1])
-            bb = dc.GetTextExtent(xticks[0][1])
-            text_height[1] = bb[1]
-            text_width[0] = 0.5*bb[0]
-            bb = dc.GetTextExtent(xticks[-1][1])
-            text_width[1] = 0.5*bb[0]
+            xticks = link.Ticks(self, xaxis[0], xaxis[1]) if link is not None else self._ticks(xaxis[0], xaxis[1])
+            first, last = text_extents.GetTextExtents(dc, (xticks[0][1], xticks[-1][1]))
+            text_height[1] = first[1]
+            text_width[0] = 0.5*first[0]
+            text_width[1] = 0.5*last[0]
         else:
             xticks = None
         if yaxis is not None:
             p1[1] = yaxis[0]
             p2[1] = yaxis[1]
             yticks = self._ticks(yaxis[0], yaxis[1])
-            for y in yticks:
-                bb = dc.GetTextExtent(y[1])
-                text_width[0] = max(text_width[0],bb[0])
-            h = 0.5*bb[1]
+            extents = text_extents.GetTextExtents(dc, [label for y, label in yticks])
+            text_width[0] = max([text_width[0]] + [bb[0] for bb in extents])
+            h = 0.5*extents[-1][1]
             text_height[0] = h
             text_height[1] = max(text_height[1], h)
         else:
             yticks = None
+        if link is not None:
+            text_width = link.Margins(self, *text_width)
         text1 = numpy.array([text_width[0], -text_height[1]])
         text2 = numpy.array([text_width[1], -text_height[0]])
         scale = (self.plotbox_size-text1-text2) / (p2-p1)
         shift = -p1*scale + self.plotbox_origin + text1
+        if link is not None:
+            scale[0], shift[0] = link.XTransform(self.plotbox_size[0], self.plotbox_origin[0], p1[0], p2[0], text1[0], text2[0])
+        self._limits = (p1, p2)
+        self._scale, self._shift = scale, shift
         self._drawAxes(dc, xaxis, yaxis, p1, p2,
                        scale, shift, xticks, yticks)
+        # only the points inside the x interval are scaled and sent to the dc
+        graphics.cull(p1[0], p2[0], p1[1], p2[1], link.index if link is not None else None)
         graphics.scaleAndShift(scale, shift)
+        c1 = numpy.floor(numpy.minimum(p1*scale+shift, p2*scale+shift))
+        c2 = numpy.ceil(numpy.maximum(p1*scale+shift, p2*scale+shift))
+        dc.SetClippingRegion(int(c1[0]), int(c1[1]), int(c2[0]-c1[0])+1, int(c2[1]-c1[1])+1)
         graphics.draw(dc)
-        dc.EndDrawing()
+        dc.DestroyClippingRegion()
+
+    def SetBackend(self, backend):
+        """Select the renderer by its key in renderers ('gc' or 'dc'), None for default_renderer."""
+        self.backend = backend
+        self.redraw()
+
+    def PixelToData(self, x, y):
+        """Convert a client pixel position to plot coordinates using the last draw's transform."""
+        return (numpy.array([x, y], dtype=float) - self._shift) / self._scale
+
+    def SetView(self, xaxis, yaxis):
+        """Show the given (lower, upper) intervals until ResetView or new graphics are drawn."""
+        self._view = (tuple(sorted(xaxis)), tuple(sorted(yaxis)))
+        if self.xlink is not None:
+            # the linked redraw happens later, move the limits now so the next pan/zoom event builds on this one
+            self._MoveLimits(self._view[0], self._view[1])
+            for p in self.xlink.panels:
+                if p is not self and p:
+                    p._MoveLimits(self._view[0])
+            self.xlink.SetInterval(self._view[0])  # redraws all the linked plots
+        else:
+            self.redraw()
+
+    def _MoveLimits(self, xaxis, yaxis=None):
+        """Set the limits and transform the next draw will have for the new intervals, keeping the pixel box."""
+        if self._limits is None:
+            return
+        p1, p2 = self._limits
+        c1, c2 = p1*self._scale+self._shift, p2*self._scale+self._shift
+        p1, p2 = p1.copy(), p2.copy()
+        (p1[0], p2[0]) = xaxis
+        if yaxis is not None:
+            (p1[1], p2[1]) = yaxis
+        self._scale = (c2-c1) / (p2-p1)
+        self._shift = c1 - p1*self._scale
+        self._limits = (p1, p2)
+
+    def ResetView(self):
+        self._view = None
+        if self.xlink is not None:
+            self.xlink.SetInterval(None)
+        else:
+            self.redraw()
+
+    def Zoom(self, factor, center=None):
+        """Scale the visible interval about center (plot coordinates, defaults to the middle of the view).
+        factor < 1 zooms in, factor may also be an (xfactor, yfactor) pair.
+        """
+        if self._limits is None:
+            return
+        lower, upper = self._limits
+        if center is None:
+            center = 0.5 * (lower + upper)
+        factor = numpy.asarray(factor, dtype=float)
+        lower = center - (center - lower) * factor
+        upper = center + (upper - center) * factor
+        self.SetView((lower[0], upper[0]), (lower[1], upper[1]))
+
+    def Pan(self, dx, dy):
+        """Move the view so the plot follows a mouse movement of dx, dy pixels."""
+        if self._limits is None:
+            return
+        delta = numpy.array([dx, dy], dtype=float) / self._scale
+        lower, upper = self._limits
+        self.SetView((lower[0] - delta[0], upper[0] - delta[0]), (lower[1] - delta[1], upper[1] - delta[1]))
 
     def _axisInterval(self, spec, lower, upper):
         if spec is None:
@@ -297,28 +1024,29 @@ class PlotCanvas(wx.Panel):
                 p2 = scale*numpy.array([upper, y])+shift
                 dc.DrawLine(p1[0],p1[1],p2[0],p2[1])
                 self.pixAxis.append((p1,p2, lower, upper, scale, shift))
-                for x, label in xticks:
-                    p = scale*numpy.array([x, y])+shift
-                    dc.DrawLine(p[0],p[1],p[0],p[1]+d)
+                py = scale[1]*y+shift[1]
+                for px, (x, label) in zip(scale[0]*numpy.array([t for t, l in xticks])+shift[0], xticks):
+                    dc.DrawLine(px,py,px,py+d)
                     if text:
-                        dc.DrawText(label,p[0],p[1])
+                        dc.DrawText(label,px,py)
                 text = 0
 
         if yaxis is not None:
             lower, upper = yaxis
             text = 1
             h = dc.GetCharHeight()
+            extents = text_extents.GetTextExtents(dc, [label for y, label in yticks])
             for x, d in [(bb1[0], -3), (bb2[0], 3)]:
                 p1 = scale*numpy.array([x, lower])+shift
                 p2 = scale*numpy.array([x, upper])+shift
                 dc.DrawLine(p1[0],p1[1],p2[0],p2[1])
                 self.pixAxis.append((p1,p2, lower, upper, scale, shift))
-                for y, label in yticks:
-                    p = scale*numpy.array([x, y])+shift
-                    dc.DrawLine(p[0],p[1],p[0]-d,p[1])
+                px = scale[0]*x+shift[0]
+                for py, (y, label), bb in zip(scale[1]*numpy.array([t for t, l in yticks])+shift[1], yticks, extents):
+                    dc.DrawLine(px,py,px-d,py)
                     if text:
-                        dc.DrawText(label,p[0]-dc.GetTextExtent(label)[0],
-                                    p[1]-0.5*h)
+                        dc.DrawText(label,px-bb[0],
+                                    py-0.5*h)
                 text = 0
 
     def _ticks(self, lower, upper):
@@ -342,12 +1070,12 @@ class PlotCanvas(wx.Panel):
         else:
             digits = -int(power)
             format = '%'+repr(digits+2)+'.'+repr(digits)+'f'
-        ticks = []
-        t = -grid*numpy.floor(-lower/grid)
-        while t <= upper:
-            ticks.append( (t, format % (t,)) )
-            t = t + grid
-        return ticks
+        first = -grid*numpy.floor(-lower/grid)
+        # a little slack so rounding doesn't drop a tick that lands exactly on upper
+        n = int(numpy.floor((upper-first)/grid + 1e-9)) + 1
+        t = first + grid*numpy.arange(max(n, 0))
+        labels = numpy.char.mod(format, t)
+        return list(zip(t.tolist(), labels.tolist()))
 
     _multiples = [(2., numpy.log10(2.)), (5., numpy.log10(5.))]
 
@@ -355,9 +1083,233 @@ class PlotCanvas(wx.Panel):
         if self.last_draw is not None:
             self.draw(*self.last_draw + (dc,))
 
+
+
+class PlotCanvas(wx.Panel, PlotPainter):
+
+    def __init__(self, parent, id = -1, backend = None):
+        wx.Panel.__init__(self, parent, id, wx.DefaultPosition, wx.DefaultSize)
+        self.border = (1,1)
+        self.SetClientSize(400,400)
+        self.SetBackgroundColour(wx.NamedColour("white"))
+
+        self.Bind(wx.EVT_SIZE, self.reconfigure)
+        self.Bind(wx.EVT_PAINT, self.OnPaint)
+        self.Bind(wx.EVT_LEFT_DOWN, self.OnMouseLeftDown)
+        self.Bind(wx.EVT_LEFT_UP, self.OnMouseLeftUp)
+        self.Bind(wx.EVT_LEFT_DCLICK, self.OnMouseDoubleClick)
+        self.Bind(wx.EVT_MOTION, self.OnMouseMotion)
+        self.Bind(wx.EVT_MOUSEWHEEL, self.OnMouseWheel)
+        self.Bind(wx.EVT_MOUSE_CAPTURE_LOST, self.OnMouseCaptureLost)
+        PlotPainter.__init__(self, *self.GetClientSize(), backend=backend)
+        self._drag_pos = None
+#	self.font = self._testFont(font)
+
+    def OnPaint(self, event):
+        pdc = wx.PaintDC(self)
+        if self.last_draw is not None:
+            self.draw(*self.last_draw + (pdc,))
+
+    def reconfigure(self, event):
+        (new_width,new_height) = self.GetClientSize()
+        if new_width == self.width and new_height == self.height:
+            return
+        self._setsize()
+        self.redraw()
+
+    def _testFont(self, font):
+        if font is not None:
+            bg = self.canvas.cget('background')
+            try:
+                item = CanvasText(self.canvas, 0, 0, anchor=NW,
+                                  text='0', fill=bg, font=font)
+                self.canvas.delete(item)
+            except TclError:
+                font = None
+        return font
+
+    def _setsize(self):
+        self.SetPlotSize(*self.GetClientSize())
+
+    def GetDrawingDC(self):
+        return wx.ClientDC(self)
+
+    _zoom_step = 1.25
+
+    def OnMouseWheel(self, event):
+        if self._limits is None:
+            return
+        steps = event.GetWheelRotation() / float(event.GetWheelDelta() or 120)
+        f = self._zoom_step ** -steps
+        # shift+wheel zooms only the x (time) axis
+        factor = (f, 1.0) if event.ShiftDown() else (f, f)
+        self.Zoom(factor, self.PixelToData(*event.GetPosition()))
+
+    def OnMouseLeftDown(self, event):
+        self._drag_pos = event.GetPosition()
+        if not self.HasCapture():
+            self.CaptureMouse()
+
+    def OnMouseMotion(self, event):
+        if self._drag_pos is not None and event.Dragging() and event.LeftIsDown():
+            pos = event.GetPosition()
+            self.Pan(pos[0] - self._drag_pos[0], pos[1] - self._drag_pos[1])
+            self._drag_pos = pos
+
+    def OnMouseLeftUp(self, event):
+        self._drag_pos = None
+        if self.HasCapture():
+            self.ReleaseMouse()
+
+    def OnMouseCaptureLost(self, event):
+        self._drag_pos = None
+
+    def OnMouseDoubleClick(self, event):
+        self.ResetView()
+
     def clear(self):
         self.canvas.delete('all')
 
+_raster_types = {'.png': wx.BITMAP_TYPE_PNG,
+                 '.bmp': wx.BITMAP_TYPE_BMP,
+                 '.jpg': wx.BITMAP_TYPE_JPEG,
+                 '.jpeg': wx.BITMAP_TYPE_JPEG,
+                 '.tif': wx.BITMAP_TYPE_TIFF,
+                 '.tiff': wx.BITMAP_TYPE_TIFF}
+
+_headless_app = None
+
+
+def _EnsureApp():
+    """wx needs an App for any drawing, make a hidden one in worker processes that don't have one."""
+    global _headless_app
+    if wx.GetApp() is None:
+        _headless_app = wx.App(False)
+
+
+def SavePlot(graphics, filename, size=(800, 600), xaxis='automatic', yaxis='automatic', backend=None, view=None):
+    """Render a PlotGraphics straight to a file, no window is created or shown.
+    The format comes from the extension: .png .bmp .jpg .tif through a wx.MemoryDC,
+    .svg through wx.SVGFileDC or .pdf as vector output through reportlab.
+    view is an optional (xinterval, yinterval) like PlotCanvas.SetView.
+    On Linux wx still needs a display connection (xvfb is fine on a server).
+    """
+    _EnsureApp()
+    width, height = size
+    painter = PlotPainter(width, height, backend)
+    if view is not None:
+        painter.SetView(*view)
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in _raster_types:
+        bmp = wx.Bitmap(width, height)
+        dc = wx.MemoryDC(bmp)
+        dc.SetBackground(wx.WHITE_BRUSH)
+        painter.draw(graphics, xaxis, yaxis, dc)
+        dc.SelectObject(wx.NullBitmap)
+        bmp.SaveFile(filename, _raster_types[ext])
+    elif ext == '.svg':
+        painter.backend = 'dc'  # no GraphicsContext for the svg dc
+        dc = wx.SVGFileDC(filename, width, height)
+        painter.draw(graphics, xaxis, yaxis, dc)
+        del dc  # the file is finished when the dc is destroyed
+    elif ext == '.pdf':
+        from reportlab.pdfgen.canvas import Canvas
+        canv = Canvas(filename, pagesize=(width, height))
+        painter.draw(graphics, xaxis, yaxis, PDFRenderer(canv, height))
+        canv.showPage()
+        canv.save()
+    else:
+        raise ValueError(str(filename) + ': unsupported plot file type')
+    return filename
+
+
+class LinkedPlotPanel(wx.Panel):
+    """A vertical stack of PlotCanvas panels on one SharedXAxis, e.g. depth, heave and sound speed against time."""
+
+    def __init__(self, parent, id = -1, npanels = 0, backend = None):
+        wx.Panel.__init__(self, parent, id)
+        self.backend = backend
+        self.xaxis = SharedXAxis()
+        self.canvases = []
+        self.SetSizer(wx.BoxSizer(wx.VERTICAL))
+        for i in range(npanels):
+            self.AddCanvas()
+
+    def AddCanvas(self, proportion=1):
+        canvas = PlotCanvas(self, backend=self.backend)
+        canvas.SetXLink(self.xaxis)
+        self.GetSizer().Add(canvas, proportion, wx.EXPAND)
+        self.canvases.append(canvas)
+        self.Layout()
+        return canvas
+
+    def draw(self, graphics, xaxis = 'automatic', yaxis = 'automatic'):
+        """graphics is a list with a PlotGraphics per canvas (None leaves that canvas as is).
+        All the canvases are drawn together once the data is set.
+        """
+        while len(self.canvases) < len(graphics):
+            self.AddCanvas()
+        for canvas, g in zip(self.canvases, graphics):
+            if g is not None:
+                canvas.SetGraphics(g, xaxis, yaxis)
+        self.xaxis.Invalidate()
+
+    def ResetView(self):
+        for canvas in self.canvases:
+            canvas._view = None
+        self.xaxis.SetInterval(None)
+
+
+def _SavePlotJob(kwargs):
+    return SavePlot(**kwargs)
+
+
+def SavePlots(jobs, processes=None):
+    """Render many plots in parallel worker processes.
+    jobs is a sequence of dicts of SavePlot keyword arguments (graphics and filename are required).
+    Returns the filenames in the order of jobs.
+    The workers are spawned, not forked, so each starts its own wx app instead of sharing the parent's toolkit state.
+    """
+    pool = multiprocessing.get_context('spawn').Pool(processes)
+    try:
+        return pool.map(_SavePlotJob, jobs)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def benchmark_renderers(sizes=(10000, 100000, 1000000), size=(800, 600), repeat=3):
+    """Time a full draw of one line and one marker series of each size with every renderer.
+    Returns {(backend, 'line' or 'marker', npoints): best seconds} and prints a table.
+    """
+    _EnsureApp()
+    painter = PlotPainter(*size)
+    results = {}
+    print("%10s" % "points" + "".join(["%12s" % (name + " line") + "%14s" % (name + " marker") for name in renderers]))
+    for n in sizes:
+        x = numpy.linspace(0., 86400., n)
+        y = numpy.sin(x / 600.) + 0.1 * numpy.random.random(n)
+        data = numpy.column_stack((x, y))
+        row = "%10d" % n
+        for name in renderers:
+            painter.backend = name
+            for kind, obj in (('line', PolyLine(data, color='red')), ('marker', PolyMarker(data, marker='dot'))):
+                graphics = PlotGraphics([obj])
+                bmp = wx.Bitmap(*size)
+                best = None
+                for i in range(repeat):
+                    dc = wx.MemoryDC(bmp)
+                    t = time.perf_counter()
+                    painter.draw(graphics, 'automatic', 'automatic', dc)
+                    dt = time.perf_counter() - t
+                    dc.SelectObject(wx.NullBitmap)
+                    best = dt if best is None else min(best, dt)
+                results[(name, kind, n)] = best
+                row += ("%12.3f" if kind == 'line' else "%14.3f") % best
+        print(row)
+    return results
+
+
 #---------------------------------------------------------------------------
 # if running standalone...
 #
@@ -397,24 +1349,24 @@ if __name__ == '__main__':
             self.mainmenu = wx.MenuBar()
 
             menu = wx.Menu()
-            menu.Append(200, '&Print...', 'Print the current plot')
-            wx.EVT_MENU(self, 200, self.OnFilePrint)
+            menu.Append(200, '&Save As...', 'Save the current plot to png, svg or pdf')
+            self.Bind(wx.EVT_MENU, self.OnFileSave, id=200)
             menu.Append(209, 'E&xit', 'Enough of this already!')
-            wx.EVT_MENU(self, 209, self.OnFileExit)
+            self.Bind(wx.EVT_MENU, self.OnFileExit, id=209)
             self.mainmenu.Append(menu, '&File')
 
             menu = wx.Menu()
             menu.Append(210, '&Draw', 'Draw plots')
-            wx.EVT_MENU(self,210,self.OnPlotDraw)
+            self.Bind(wx.EVT_MENU, self.OnPlotDraw, id=210)
             menu.Append(211, '&Redraw', 'Redraw plots')
-            wx.EVT_MENU(self,211,self.OnPlotRedraw)
+            self.Bind(wx.EVT_MENU, self.OnPlotRedraw, id=211)
             menu.Append(212, '&Clear', 'Clear canvas')
-            wx.EVT_MENU(self,212,self.OnPlotClear)
+            self.Bind(wx.EVT_MENU, self.OnPlotClear, id=212)
             self.mainmenu.Append(menu, '&Plot')
 
             menu = wx.Menu()
             menu.Append(220, '&About', 'About this thing...')
-            wx.EVT_MENU(self, 220, self.OnHelpAbout)
+            self.Bind(wx.EVT_MENU, self.OnHelpAbout, id=220)
             self.mainmenu.Append(menu, '&Help')
 
             self.SetMenuBar(self.mainmenu)
@@ -424,31 +1376,32 @@ if __name__ == '__main__':
 
             self.client = PlotCanvas(self)
 
-	def OnFilePrint(self, event):
-	    d = wx.MessageDialog(self,
-"""As of this writing, printing support in wx.Python is shaky at best.
-Are you sure you want to do this?""", "Danger!", wx.YES_NO)
-            if d.ShowModal() == wx.ID_YES:
-                psdc = wx.PostScriptDC("out.ps", True, self)
-                self.client.redraw(psdc)
+        def OnFileSave(self, event):
+            if self.client.last_draw is None:
+                return
+            d = wx.FileDialog(self, "Save plot", wildcard="PNG (*.png)|*.png|SVG (*.svg)|*.svg|PDF (*.pdf)|*.pdf",
+                              style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT)
+            if d.ShowModal() == wx.ID_OK:
+                graphics, xaxis, yaxis = self.client.last_draw
+                SavePlot(graphics, d.GetPath(), tuple(self.client.GetClientSize()), xaxis, yaxis, view=self.client._view)
 
-	def OnFileExit(self, event):
-	    self.Close()
+        def OnFileExit(self, event):
+            self.Close()
 
-	def OnPlotDraw(self, event):
-	    self.client.draw(_InitObjects(),'automatic','automatic');
+        def OnPlotDraw(self, event):
+            self.client.draw(_InitObjects(),'automatic','automatic');
 
-	def OnPlotRedraw(self,event):
-	    self.client.redraw()
+        def OnPlotRedraw(self,event):
+            self.client.redraw()
 
-	def OnPlotClear(self,event):
-	    self.client.last_draw = None
-	    dc = wx.ClientDC(self.client)
-	    dc.Clear()
+        def OnPlotClear(self,event):
+            self.client.last_draw = None
+            dc = wx.ClientDC(self.client)
+            dc.Clear()
 
-	def OnHelpAbout(self, event):
-	    about = wx.MessageDialog(self, __doc__, "About...", wx.OK)
-	    about.ShowModal()
+        def OnHelpAbout(self, event):
+            about = wx.MessageDialog(self, __doc__, "About...", wx.OK)
+            about.ShowModal()
 
 
 
@@ -460,8 +1413,11 @@ Are you sure you want to do this?""", "Danger!", wx.YES_NO)
             return True
 
 
-    app = MyApp(0)
-    app.MainLoop()
+    if '--benchmark' in sys.argv:
+        benchmark_renderers()
+    else:
+        app = MyApp(0)
+        app.MainLoop()
 
 
 